@@ -0,0 +1,8 @@
+"""
+benchmarks
+
+Reproducible throughput and latency benchmarks for Parse
+
+	python -m benchmarks.run [--tokens N] [--seed S] [--lexicon PATH] [--output FILE]
+
+"""
@@ -0,0 +1,108 @@
+"""
+corpus.py
+
+Deterministic benchmark corpus built from the lexicon data
+
+Tokens are generated from STEMLIST.GEN (stems), INFLECTS.LAT (endings,
+via open_words.inflects), UNIQUES.LAT (via open_words.uniques) and the
+addons, and each token is labelled with the parser path it exercises:
+
+	unique     a word from the uniques list
+	direct     a stem with one of its inflection endings
+	enclitic   a direct form with an enclitic (-que, -ne, -ve) attached
+	reduced    a direct form with a prefix attached
+	unknown    a made-up word (consonant-vowel syllables) or a stem with
+	           an ending of another declension or conjugation, kept only
+	           if it is no stem + ending and no unique of the lexicon
+
+"""
+
+import os
+import random
+
+PATHS = ( "unique", "direct", "enclitic", "reduced", "unknown" )
+
+STEMLIST = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), "open_words", "data", "STEMLIST.GEN" )
+
+ENCLITICS = ( "que", "ne", "ve" )
+
+# Letters of the made-up unknown words
+CONSONANTS = "bcdfglmnprstv"
+VOWELS = "aeiou"
+
+
+def read_stems(path=STEMLIST):
+	"""Read ( orth, pos, n[0] ) for every stem in STEMLIST.GEN"""
+	stems = []
+	with open( path ) as f:
+		for line in f:
+			n = line[26:30].strip().split(" ")
+			try:
+				n0 = int( n[0] )
+			except ValueError:
+				n0 = n[0]
+
+			stems.append( ( line[0:19].strip(), line[19:26].strip(), n0 ) )
+
+	return stems
+
+
+def generate_corpus(tokens_per_path=2000, seed=0):
+	"""Return a list of ( path, token ), the same for a given seed"""
+	from open_words.inflects import Inflects
+	from open_words.uniques import Uniques
+	from open_words.addons import LatinAddons
+
+	rng = random.Random( seed )
+
+	# Endings for each (pos, n[0]), with the participle / verb rule of Parse
+	endings = {}
+	for infl in sorted( Inflects, key=lambda x: ( len( x['ending'] ), x['ending'], x['pos'], x['form'] ) ):
+		if " " in infl['ending']:
+			continue
+		endings.setdefault( ( infl['pos'], infl['n'][0] ), [] ).append( infl['ending'] )
+		if infl['pos'] == "VPAR":
+			endings.setdefault( ( "V", infl['n'][0] ), [] ).append( infl['ending'] )
+
+	stems = [ stem for stem in read_stems() if ( stem[1], stem[2] ) in endings ]
+	uniques = sorted( set( u['orth'] for u in Uniques ) )
+	prefixes = sorted( set( p['orth'] for p in LatinAddons['prefixes'] if " " not in p['orth'] ) )
+
+	# Any ending after any stem, or a unique, is taken as known
+	stem_orths = set( stem[0] for stem in read_stems() )
+	all_endings = sorted( set( ending for group in endings.values() for ending in group ) )
+	known_endings = set( all_endings )
+	known_uniques = set( uniques )
+
+	def direct():
+		orth, pos, n0 = rng.choice( stems )
+		return orth + rng.choice( endings[( pos, n0 )] )
+
+	def is_known(token):
+		if token in known_uniques:
+			return True
+
+		return any( token[:i] in stem_orths and token[i:] in known_endings for i in range( len( token ) + 1 ) )
+
+	def unknown():
+		while True:
+			if rng.random() < 0.5:
+				token = "".join( rng.choice( CONSONANTS ) + rng.choice( VOWELS ) for _ in range( rng.randint( 2, 4 ) ) )
+				token += rng.choice( ( "", "s", "m", "nt", "r" ) )
+			else:
+				token = rng.choice( stems )[0] + rng.choice( all_endings )
+
+			if not is_known( token ):
+				return token
+
+	corpus = []
+	for _ in range( tokens_per_path ):
+		corpus.append( ( "unique", rng.choice( uniques ) ) )
+		corpus.append( ( "direct", direct() ) )
+		corpus.append( ( "enclitic", direct() + rng.choice( ENCLITICS ) ) )
+		corpus.append( ( "reduced", rng.choice( prefixes ) + direct() ) )
+		corpus.append( ( "unknown", unknown() ) )
+
+	rng.shuffle( corpus )
+
+	return corpus
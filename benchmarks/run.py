@@ -0,0 +1,150 @@
+"""
+run.py
+
+Measure Parse startup, throughput, per-token latency and peak memory,
+and print the results as JSON
+
+	python -m benchmarks.run [--tokens N] [--seed S] [--lexicon PATH] [--forms PATH]
+	                         [--cache-size N] [--repeat N] [--output FILE]
+
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import resource
+import sys
+import time
+
+from benchmarks.corpus import PATHS, generate_corpus
+
+DATA_MODULES = (
+	"open_words.dict_line",
+	"open_words.stem_list",
+	"open_words.inflects",
+	"open_words.uniques",
+	"open_words.addons",
+)
+
+
+def time_imports(modules=DATA_MODULES):
+	"""Seconds to import each data module (None if it cannot be imported)"""
+	timings = {}
+	for module in modules:
+		if module in sys.modules:
+			timings[module] = 0.0
+			continue
+
+		start = time.perf_counter()
+		try:
+			importlib.import_module( module )
+		except ImportError:
+			timings[module] = None
+		else:
+			timings[module] = time.perf_counter() - start
+
+	return timings
+
+
+def percentile(sorted_values, p):
+	if not sorted_values:
+		return None
+
+	i = min( len( sorted_values ) - 1, int( round( p / 100.0 * ( len( sorted_values ) - 1 ) ) ) )
+	return sorted_values[i]
+
+
+def summarize(latencies):
+	"""Throughput and latency (microseconds) for a list of per-token seconds"""
+	latencies = sorted( latencies )
+	total = sum( latencies )
+
+	return {
+			'tokens' : len( latencies ),
+			'seconds' : total,
+			'tokens_per_sec' : len( latencies ) / total if total else None,
+			'mean_us' : 1e6 * total / len( latencies ) if latencies else None,
+			'p50_us' : 1e6 * percentile( latencies, 50 ) if latencies else None,
+			'p99_us' : 1e6 * percentile( latencies, 99 ) if latencies else None,
+		}
+
+
+def peak_rss_kb():
+	rss = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+
+	# Linux reports kilobytes, macOS bytes
+	if sys.platform == "darwin":
+		rss //= 1024
+
+	return rss
+
+
+def run(tokens_per_path=2000, seed=0, lexicon=None, forms=None, cache_size=None, repeat=1):
+	"""Run the benchmark and return the report as a dict"""
+	report = {
+			'python' : platform.python_version(),
+			'platform' : platform.platform(),
+			'config' : {
+					'tokens_per_path' : tokens_per_path,
+					'seed' : seed,
+					'lexicon' : lexicon,
+					'forms' : forms,
+					'cache_size' : cache_size,
+					'repeat' : repeat,
+				},
+		}
+
+	# Startup, measured before anything else loads the data
+	startup = {}
+	if lexicon is None:
+		startup['imports'] = time_imports()
+
+	start = time.perf_counter()
+	from open_words.parse import Parse
+	parser = Parse( lexicon=lexicon, forms=forms, cache_size=cache_size )
+	startup['parse_init'] = time.perf_counter() - start
+	report['startup'] = startup
+
+	corpus = generate_corpus( tokens_per_path, seed )
+
+	latencies = { path : [] for path in PATHS }
+	clock = time.perf_counter
+	for _ in range( repeat ):
+		for path, token in corpus:
+			start = clock()
+			parser.parse( token )
+			latencies[path].append( clock() - start )
+
+	report['overall'] = summarize( [ t for path in PATHS for t in latencies[path] ] )
+	report['paths'] = { path : summarize( latencies[path] ) for path in PATHS }
+	report['peak_rss_kb'] = peak_rss_kb()
+
+	return report
+
+
+def main(argv=None):
+	argp = argparse.ArgumentParser( description="Open Words parser benchmark" )
+	argp.add_argument( "--tokens", type=int, default=2000, help="tokens per parser path" )
+	argp.add_argument( "--seed", type=int, default=0 )
+	argp.add_argument( "--lexicon", default=None, help="binary lexicon file" )
+	argp.add_argument( "--forms", default=None, help="full-form table file" )
+	argp.add_argument( "--cache-size", type=int, default=None )
+	argp.add_argument( "--repeat", type=int, default=1, help="passes over the corpus" )
+	argp.add_argument( "--output", default=None, help="write the JSON report here instead of stdout" )
+	args = argp.parse_args( argv )
+
+	report = run( args.tokens, args.seed, args.lexicon, args.forms, args.cache_size, args.repeat )
+	data = json.dumps( report, indent=2, sort_keys=True )
+
+	if args.output:
+		with open( args.output, "w" ) as out:
+			out.write( data + "\n" )
+	else:
+		print( data )
+
+	return
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,52 @@
+"""
+affixes.py
+
+Tries over the prefix and suffix addons
+
+A prefix trie walks a word from its start and a suffix trie walks it
+from its end, so every addon a word starts (or ends) with is found in
+one pass over the word, however long the addon lists are.
+
+"""
+
+
+class AffixTrie:
+	"""
+	Trie of addon spellings; with reverse=True the spellings are stored
+	back to front and matched against the end of a word
+	"""
+
+	def __init__(self, entries, reverse=False):
+		self.reverse = reverse
+
+		# Nodes are [ children, ( ( list position, addon ), ... ) ]
+		self.root = [ {}, () ]
+		for i, entry in enumerate( entries ):
+			node = self.root
+			for c in self._walk( entry['orth'] ):
+				node = node[0].setdefault( c, [ {}, () ] )
+			node[1] = node[1] + ( ( i, entry ), )
+
+	def _walk(self, s):
+		if self.reverse:
+			return reversed( s )
+
+		return s
+
+	def matches(self, s):
+		"""
+		Return the addons that s starts with (ends with, for a reverse
+		trie), in the order of the original list
+		"""
+		found = list( self.root[1] )
+
+		node = self.root
+		for c in self._walk( s ):
+			node = node[0].get( c )
+			if node is None:
+				break
+			found.extend( node[1] )
+
+		found.sort( key=lambda match: match[0] )
+
+		return [ entry for i, entry in found ]
@@ -0,0 +1,141 @@
+"""
+async_parse.py
+
+asyncio front end for Parse
+
+Lookups run on an executor so they do not block the event loop. Requests
+that arrive within a short window are coalesced into one parse_many
+batch, and identical words that are already pending or being parsed
+wait for the same result instead of being parsed again.
+
+Usage:
+
+	parser = AsyncParse( Parse( lexicon="open_words/data/lexicon.bin" ) )
+	result = await parser.parse( "portae" )
+
+"""
+
+import asyncio
+import copy
+
+
+class AsyncParse:
+	"""
+	Coalescing asyncio wrapper around a Parse instance
+
+	window is how long (in seconds) the first request of a batch waits for
+	others to join it; a batch is sent early once it holds max_batch
+	distinct words. Callers that shared a lookup each get their own copy
+	of the result, and a word that raises only fails its own callers.
+	"""
+
+	def __init__(self, parser=None, executor=None, window=0.002, max_batch=256):
+		if parser is None:
+			from open_words.parse import Parse
+			parser = Parse()
+
+		self.parser = parser
+		self.executor = executor
+		self.window = window
+		self.max_batch = max_batch
+
+		# ( word, direction, formatted ) -> [ future, number of callers ], until its result is set
+		self._pending = {}
+		self._queue = []
+		self._timer = None
+
+	async def parse(self, word, direction="latin_to_english", formatted=True):
+		"""Parse a word on the executor, sharing the work with concurrent identical requests"""
+		loop = asyncio.get_running_loop()
+		key = ( word, direction, formatted )
+
+		pending = self._pending.get( key )
+		if pending is None:
+			pending = self._pending[key] = [ loop.create_future(), 1 ]
+			self._queue.append( key )
+
+			if len( self._queue ) >= self.max_batch:
+				self._flush( loop )
+			elif self._timer is None:
+				self._timer = loop.call_later( self.window, self._flush, loop )
+		else:
+			pending[1] += 1
+
+		# A cancelled caller must not cancel the lookup for the others
+		future = pending[0]
+		result = await asyncio.shield( future )
+
+		# Callers of a shared lookup must not see each other's changes to the result
+		if pending[1] > 1:
+			result = copy.deepcopy( result )
+
+		return result
+
+	async def parse_many(self, words, direction="latin_to_english", formatted=True):
+		"""Parse several words concurrently; return the results in order"""
+		return await asyncio.gather( *[ self.parse( word, direction, formatted ) for word in words ] )
+
+	def _flush(self, loop):
+		"""Send the queued words to the executor as one batch"""
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+
+		batch = self._queue
+		self._queue = []
+		if not batch:
+			return
+
+		running = loop.run_in_executor( self.executor, self._parse_batch, batch )
+		running.add_done_callback( lambda done: self._resolve( batch, done ) )
+
+		return
+
+	def _parse_batch(self, batch):
+		"""
+		Run on the executor: parse the batch, one parse_many call per
+		(direction, formatted); return ( result, exception ) for each key
+		"""
+		groups = {}
+		for word, direction, formatted in batch:
+			groups.setdefault( ( direction, formatted ), [] ).append( word )
+
+		results = {}
+		for ( direction, formatted ), words in groups.items():
+			try:
+				parsed = [ ( result, None ) for result in self.parser.parse_many( words, direction, formatted ) ]
+			except Exception:
+				# Parse the words one by one, so that a failing word only fails its own callers
+				parsed = [ self._parse_one( word, direction, formatted ) for word in words ]
+
+			for word, outcome in zip( words, parsed ):
+				results[( word, direction, formatted )] = outcome
+
+		return results
+
+	def _parse_one(self, word, direction, formatted):
+		"""Return ( result, None ) for word, or ( None, the exception it raised )"""
+		try:
+			return self.parser.parse( word, direction, formatted ), None
+		except Exception as e:
+			return None, e
+
+	def _resolve(self, batch, done):
+		"""Back on the event loop: hand the results to the waiting requests"""
+		for key in batch:
+			future = self._pending.pop( key )[0]
+			if future.done():
+				continue
+
+			if done.cancelled():
+				future.cancel()
+			elif done.exception() is not None:
+				future.set_exception( done.exception() )
+			else:
+				result, error = done.result()[key]
+				if error is not None:
+					future.set_exception( error )
+				else:
+					future.set_result( result )
+
+		return
@@ -0,0 +1,186 @@
+"""
+automaton.py
+
+Minimal acyclic finite-state automaton mapping strings to integers
+
+Each key is stored as the path key + SEPARATOR + chr(value), so keys with
+common prefixes share states from the start, and keys with a common
+ending and the same value share states to the end (the automaton is
+built minimal with Daciuk's incremental algorithm over sorted keys).
+
+Once built, the automaton is packed into flat arrays:
+
+	first   for each state, the index of its first transition
+	        (with one extra entry, so a state's transitions are first[s]:first[s + 1])
+	labels  transition labels (code points), sorted within each state
+	targets transition target states
+
+State 0 is the start state.
+
+"""
+
+from array import array
+from bisect import bisect_left
+
+SEPARATOR = "\0"
+
+
+class _BuildState:
+	__slots__ = ( 'edges', 'final' )
+
+	def __init__(self):
+		self.edges = {}
+		self.final = False
+
+
+class Automaton:
+	"""Read-only string -> int map stored as a minimal acyclic automaton"""
+
+	def __init__(self, first, labels, targets, final, size):
+		self.first = first
+		self.labels = labels
+		self.targets = targets
+		self.final = final
+		self.size = size
+
+	@classmethod
+	def build(cls, items):
+		"""
+		Build from ( key, value ) pairs; keys must be unique and must not
+		contain SEPARATOR, values must be below 0x110000
+		"""
+		words = sorted( key + SEPARATOR + chr( value ) for key, value in items )
+
+		root = _BuildState()
+		register = {}
+		previous = ""
+
+		for word in words:
+			# Walk the prefix shared with the previous word
+			common = 0
+			state = root
+			while common < len( word ) and common < len( previous ) and word[common] == previous[common]:
+				state = state.edges[word[common]]
+				common += 1
+
+			# The rest of the previous word can no longer change
+			if state.edges:
+				cls._register( state, register )
+
+			for c in word[common:]:
+				nxt = _BuildState()
+				state.edges[c] = nxt
+				state = nxt
+			state.final = True
+
+			previous = word
+
+		cls._register( root, register )
+
+		return cls._pack( root, len( words ) )
+
+	@classmethod
+	def _register(cls, state, register):
+		"""Replace the last branch of state by equivalent registered states"""
+		path = []
+		while state.edges:
+			label = next( reversed( state.edges ) )
+			path.append( ( state, label ) )
+			state = state.edges[label]
+
+		for parent, label in reversed( path ):
+			child = parent.edges[label]
+			key = ( child.final, tuple( ( c, id( t ) ) for c, t in child.edges.items() ) )
+			registered = register.get( key )
+			if registered is None:
+				register[key] = child
+			else:
+				parent.edges[label] = registered
+
+		return
+
+	@classmethod
+	def _pack(cls, root, size):
+		numbers = { id( root ) : 0 }
+		order = [ root ]
+
+		# Number the states breadth first
+		i = 0
+		while i < len( order ):
+			for t in order[i].edges.values():
+				if id( t ) not in numbers:
+					numbers[id( t )] = len( order )
+					order.append( t )
+			i += 1
+
+		first = array( "I" )
+		labels = array( "I" )
+		targets = array( "I" )
+		final = bytearray( len( order ) )
+
+		for n, state in enumerate( order ):
+			first.append( len( labels ) )
+			final[n] = state.final
+			for c, t in sorted( state.edges.items() ):
+				labels.append( ord( c ) )
+				targets.append( numbers[id( t )] )
+		first.append( len( labels ) )
+
+		return cls( first, labels, targets, final, size )
+
+	def _step(self, state, c):
+		lo = self.first[state]
+		hi = self.first[state + 1]
+		i = bisect_left( self.labels, c, lo, hi )
+		if i < hi and self.labels[i] == c:
+			return self.targets[i]
+
+		return None
+
+	def _walk(self, s):
+		state = 0
+		for c in s:
+			state = self._step( state, ord( c ) )
+			if state is None:
+				return None
+
+		return state
+
+	def get(self, key, default=None):
+		"""Return the value stored for key"""
+		state = self._walk( key + SEPARATOR )
+		if state is None:
+			return default
+
+		# A key has exactly one value, so the state has exactly one transition
+		return self.labels[self.first[state]]
+
+	def __contains__(self, key):
+		return self._walk( key + SEPARATOR ) is not None
+
+	def __len__(self):
+		return self.size
+
+	def items(self, prefix=""):
+		"""Yield ( key, value ) for every key starting with prefix, in sorted order"""
+		state = self._walk( prefix )
+		if state is None:
+			return
+
+		stack = [ ( state, prefix ) ]
+		while stack:
+			state, key = stack.pop()
+			lo = self.first[state]
+			hi = self.first[state + 1]
+
+			# Push in reverse, so the smallest label is visited first
+			for i in range( hi - 1, lo - 1, -1 ):
+				c = self.labels[i]
+				if c == ord( SEPARATOR ):
+					yield key, self.labels[self.first[self.targets[i]]]
+				else:
+					stack.append( ( self.targets[i], key + chr( c ) ) )
+
+	def keys(self, prefix=""):
+		for key, value in self.items( prefix ):
+			yield key
@@ -0,0 +1,202 @@
+"""
+build_lexicon.py
+
+Compile the parser data (DICTLINE, STEMLIST, INFLECTS, UNIQUES and
+ADDONS, as loaded from the Python data modules) into the binary lexicon
+file read by lexicon.py
+
+Usage:
+
+	python -m open_words.build_lexicon [output path]
+
+"""
+
+import json
+import sys
+from array import array
+
+from open_words.lexicon import (
+		MAGIC, VERSION, HEADER, DIRECTORY_ENTRY, MISSING, SLOT_WIDTH, DEFAULT_PATH,
+		WORD_FIELDS, STEM_FIELDS, INFLECT_FIELDS, UNIQUE_FIELDS, ADDON_FIELDS,
+		hash_key,
+	)
+from open_words.orthography import STRICT
+
+
+class LexiconBuilder:
+	"""Accumulate the string pool, list pool and tables for one lexicon file"""
+
+	def __init__(self):
+		self.strings = bytearray()
+		self.string_refs = {}
+		self.lists = array( "I" )
+		self.list_refs = {}
+		self.sections = []
+
+	def string(self, s):
+		"""Add a string to the pool (once) and return its (offset, length)"""
+		ref = self.string_refs.get( s )
+		if ref is None:
+			data = s.encode( "utf-8" )
+			ref = ( len( self.strings ), len( data ) )
+			self.strings.extend( data )
+			self.string_refs[s] = ref
+
+		return ref
+
+	def string_list(self, items):
+		"""Add a list of strings to the list pool (once) and return its (offset, count)"""
+		items = tuple( str( v ) for v in items )
+		ref = self.list_refs.get( items )
+		if ref is None:
+			ref = ( len( self.lists ) // 2, len( items ) )
+			for item in items:
+				self.lists.extend( self.string( item ) )
+			self.list_refs[items] = ref
+
+		return ref
+
+	def table(self, name, fields, records):
+		"""Add a fixed-width record table"""
+		cells = array( "I" )
+
+		for record in records:
+			for field, kind in fields:
+				if field not in record:
+					cells.extend( ( MISSING, 0 ) )
+				elif kind == 'int':
+					cells.extend( ( record[field], 0 ) )
+				elif kind == 'str':
+					cells.extend( self.string( record[field] ) )
+				else:
+					cells.extend( self.string_list( record[field] ) )
+
+		self.section( name, cells.tobytes() )
+
+	def hash_index(self, name, keyed):
+		"""
+		Add a hash index from a list of ( key, record number ) pairs;
+		record numbers for a key keep the order they were given in
+		"""
+		postings = {}
+		for key, i in keyed:
+			postings.setdefault( key, [] ).append( i )
+
+		# Keep the table at most half full
+		size = 1
+		while size < 2 * len( postings ):
+			size *= 2
+
+		slots = array( "I", [0] * ( size * SLOT_WIDTH ) )
+		flat = array( "I" )
+
+		for key, found in postings.items():
+			data = key.encode( "utf-8" )
+			offset, length = self.string( key )
+			slot = hash_key( data ) & ( size - 1 )
+			while slots[slot * SLOT_WIDTH + 3] != 0:
+				slot = ( slot + 1 ) & ( size - 1 )
+
+			slots[slot * SLOT_WIDTH:( slot + 1 ) * SLOT_WIDTH] = array( "I", ( offset, length, len( flat ), len( found ) ) )
+			flat.extend( found )
+
+		cells = array( "I", [size] )
+		cells.extend( slots )
+		cells.extend( flat )
+		self.section( name, cells.tobytes() )
+
+	def section(self, name, data):
+		self.sections.append( ( name, bytes( data ) ) )
+
+	def write(self, path):
+		"""Write the header, section directory and 8-byte aligned sections"""
+		sections = list( self.sections )
+		sections.append( ( "strings", bytes( self.strings ) ) )
+		sections.append( ( "lists", self.lists.tobytes() ) )
+
+		offset = HEADER.size + len( sections ) * DIRECTORY_ENTRY.size
+		directory = []
+		for name, data in sections:
+			offset += -offset % 8
+			directory.append( ( name, offset, len( data ) ) )
+			offset += len( data )
+
+		with open( path, "wb" ) as f:
+			f.write( HEADER.pack( MAGIC, VERSION, len( sections ) ) )
+			for name, offset, length in directory:
+				f.write( DIRECTORY_ENTRY.pack( name.encode( "ascii" ), offset, length ) )
+
+			for ( name, data ), ( _, offset, _ ) in zip( sections, directory ):
+				f.write( b"\0" * ( offset - f.tell() ) )
+				f.write( data )
+
+		return
+
+
+def build_lexicon(path=DEFAULT_PATH, words_dict=None, stems=None, inflects=None, uniques=None, addons=None, orthography=STRICT):
+	"""
+	Write the lexicon file; any data not passed in is loaded from the
+	open_words data modules
+
+	The stem, ending and unique indexes are keyed by spellings normalized
+	with orthography (see orthography.py); a Parse using another
+	orthography rebuilds them in memory
+	"""
+	if words_dict is None:
+		from open_words.dict_line import WordsDict as words_dict
+	if stems is None:
+		from open_words.stem_list import Stems as stems
+	if inflects is None:
+		from open_words.inflects import Inflects as inflects
+	if uniques is None:
+		from open_words.uniques import Uniques as uniques
+	if addons is None:
+		from open_words.addons import LatinAddons as addons
+
+	if sys.byteorder != "little":
+		raise ValueError( "The binary lexicon can only be built on little-endian hosts" )
+
+	# Same order as Parse uses: inflections sorted by length of ending
+	inflects = sorted( inflects, key=lambda x: len( x['ending'] ) )
+
+	builder = LexiconBuilder()
+
+	builder.table( "words", WORD_FIELDS, words_dict )
+	builder.table( "stems", STEM_FIELDS, stems )
+	builder.table( "inflects", INFLECT_FIELDS, inflects )
+	builder.table( "uniques", UNIQUE_FIELDS, uniques )
+
+	addon_records = []
+	categories = []
+	for category, entries in addons.items():
+		categories.append( [ category, len( addon_records ), len( entries ) ] )
+		addon_records.extend( entries )
+	builder.table( "addons", ADDON_FIELDS, addon_records )
+
+	# Word id -> record number + 1
+	ids = array( "I", [0] * ( max( [ word['id'] for word in words_dict ] + [0] ) + 1 ) )
+	for i, word in enumerate( words_dict ):
+		ids[word['id']] = i + 1
+	builder.section( "ix_words", ids.tobytes() )
+
+	normalize = orthography.normalize
+	normalize_ending = orthography.normalize_letters
+
+	builder.hash_index( "ix_stems", [ ( normalize( stem['orth'] ), i ) for i, stem in enumerate( stems ) ] )
+	builder.hash_index( "ix_infl", [ ( normalize_ending( infl['ending'] ), i ) for i, infl in enumerate( inflects ) ] )
+	builder.hash_index( "ix_uniq", [ ( normalize( u['orth'] ), i ) for i, u in enumerate( uniques ) ] )
+
+	meta = {
+			'addons' : categories,
+			'ending_lengths' : sorted( set( len( normalize_ending( infl['ending'] ) ) for infl in inflects ) ),
+			'orthography' : orthography.name,
+		}
+	builder.section( "meta", json.dumps( meta ).encode( "utf-8" ) )
+
+	builder.write( path )
+
+	return path
+
+
+if __name__ == "__main__":
+	print( build_lexicon( *sys.argv[1:2] ) )
@@ -0,0 +1,135 @@
+"""
+cache.py
+
+Bounded LRU caches for parse results
+
+Results are kept serialized (pickle, since unformatted results hold
+lexicon records), so every hit hands out a fresh copy: callers may
+change what they get back without corrupting the cache, and the size
+of an entry in bytes is known exactly. ReferenceCache keeps the values
+themselves instead, for intermediate results that nobody changes.
+
+"""
+
+import pickle
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple( 'CacheInfo', [ 'hits', 'misses', 'maxsize', 'maxbytes', 'currsize', 'currbytes' ] )
+
+
+class ResultCache:
+	"""
+	LRU cache bounded by a number of entries (maxsize), a total size of
+	the serialized results in bytes (maxbytes), or both
+	"""
+
+	def __init__(self, maxsize=None, maxbytes=None):
+		if maxsize is None and maxbytes is None:
+			raise ValueError( "ResultCache needs a maxsize or a maxbytes bound" )
+
+		self.maxsize = maxsize
+		self.maxbytes = maxbytes
+
+		self._data = OrderedDict()
+		self._bytes = 0
+		self._hits = 0
+		self._misses = 0
+		self._lock = threading.Lock()
+
+	def get(self, key):
+		"""Return a copy of the cached result for key, or None"""
+		with self._lock:
+			blob = self._data.get( key )
+			if blob is None:
+				self._misses += 1
+				return None
+
+			self._data.move_to_end( key )
+			self._hits += 1
+
+		return pickle.loads( blob )
+
+	def put(self, key, value):
+		"""Cache a copy of value, evicting the least recently used results if needed"""
+		blob = pickle.dumps( value, pickle.HIGHEST_PROTOCOL )
+
+		# Never let a single result flush the whole cache
+		if self.maxbytes is not None and len( blob ) > self.maxbytes:
+			return
+
+		with self._lock:
+			old = self._data.pop( key, None )
+			if old is not None:
+				self._bytes -= len( old )
+
+			self._data[key] = blob
+			self._bytes += len( blob )
+
+			while (
+					( self.maxsize is not None and len( self._data ) > self.maxsize )
+				or
+					( self.maxbytes is not None and self._bytes > self.maxbytes )
+				):
+				evicted_key, evicted = self._data.popitem( last=False )
+				self._bytes -= len( evicted )
+
+		return
+
+	def clear(self):
+		"""Drop all results and reset the statistics, e.g. after reloading the lexicon"""
+		with self._lock:
+			self._data.clear()
+			self._bytes = 0
+			self._hits = 0
+			self._misses = 0
+
+		return
+
+	def cache_info(self):
+		with self._lock:
+			return CacheInfo( self._hits, self._misses, self.maxsize, self.maxbytes, len( self._data ), self._bytes )
+
+	def __len__(self):
+		return len( self._data )
+
+
+class ReferenceCache:
+	"""
+	LRU cache of up to maxsize values, stored as they are (not copied):
+	the values must not be changed by whoever gets them back
+	"""
+
+	def __init__(self, maxsize):
+		self.maxsize = maxsize
+
+		self._data = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key):
+		"""Return the cached value for key, or None"""
+		with self._lock:
+			value = self._data.get( key )
+			if value is not None:
+				self._data.move_to_end( key )
+
+		return value
+
+	def put(self, key, value):
+		"""Cache value, evicting the least recently used values if needed"""
+		with self._lock:
+			self._data[key] = value
+			self._data.move_to_end( key )
+			while len( self._data ) > self.maxsize:
+				self._data.popitem( last=False )
+
+		return
+
+	def clear(self):
+		with self._lock:
+			self._data.clear()
+
+		return
+
+	def __len__(self):
+		return len( self._data )
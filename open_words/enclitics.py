@@ -0,0 +1,119 @@
+"""
+enclitics.py
+
+Split enclitics and other tacked-on particles from words
+
+The addon lists are compiled once into read-only tables keyed by
+spelling, so a word is split with a few dict lookups (one per distinct
+suffix length) and the shared addon data is never changed. A splitter
+can be used by any number of threads at once.
+
+With a normalize function (see orthography.py), the tables are keyed by
+the normalized spellings and match the normalized end of a word, so
+that e.g. -ue is split as the enclitic -ve.
+
+"""
+
+from open_words.records import Addon
+
+
+class SuffixTable:
+	"""
+	Addons of one category by spelling; match() returns the addon that
+	comes first in the original list among those the word ends with
+	"""
+
+	def __init__(self, entries, normalize=None):
+		self.normalize = normalize
+		self.entries = {}
+		for i, entry in enumerate( entries ):
+			key = entry['orth'] if normalize is None else normalize( entry['orth'] )
+			self.entries.setdefault( key, ( i, entry ) )
+
+		self.lengths = tuple( sorted( set( len( orth ) for orth in self.entries ) ) )
+
+	def match(self, s):
+		best = None
+
+		for length in self.lengths:
+			if length > len( s ):
+				break
+
+			tail = s[len( s ) - length:]
+			if self.normalize is not None:
+				tail = self.normalize( tail )
+				# (the u of qu is never a v: ali-quis is not aliq-vis)
+				if len( tail ) != length or ( tail[0] == "u" and s[len( s ) - length - 1:len( s ) - length] == "q" ):
+					continue
+
+			found = self.entries.get( tail )
+			if found is not None and ( best is None or found[0] < best[0] ):
+				best = found
+
+		if best is None:
+			return None
+
+		return best[1]
+
+
+class EncliticSplitter:
+	"""
+	Compiled tackons, packons, not_packons and tickons of an addons
+	mapping (see addons.py)
+	"""
+
+	def __init__(self, addons, normalize=None):
+		# Tackons are output with their spelling as form, the others with their part of speech
+		self.tackons = SuffixTable( self._compile( addons['tackons'], 'orth' ), normalize )
+		self.packons = SuffixTable( self._compile( addons['packons'], 'pos' ), normalize )
+		self.not_packons = SuffixTable( self._compile( addons['not_packons'], 'pos' ), normalize )
+		self.tickons = tuple( self._compile( addons.get( 'tickons', [] ), 'pos' ) )
+
+	def _compile(self, entries, form_field):
+		shared = {}
+		compiled = []
+
+		for e in entries:
+			data = dict( e.items() )
+			data['form'] = data[form_field]
+			compiled.append( Addon.from_dict( data, shared ) )
+
+		return compiled
+
+	def split(self, s):
+		"""
+		Split a tackon, then a packon (words starting with "qu") or a
+		not_packon from the end of s; return the rest of s and the
+		result entries for the split addons
+		"""
+		out = []
+
+		e = self.tackons.match( s )
+		if e is not None:
+			# Est exception
+			if s != "est":
+				out.append( { 'w' : e, "stems" : [] } )
+				s = s[:len( s ) - len( e['orth'] )]
+
+		if s.startswith( "qu" ):
+			e = self.packons.match( s )
+		else:
+			e = self.not_packons.match( s )
+
+		if e is not None:
+			out.append( { 'w' : e } )
+			s = s[:len( s ) - len( e['orth'] )]
+
+		return s, out
+
+	def split_tickon(self, s):
+		"""
+		Split a tickon from the start of a word like "siquis" (a tickon
+		followed by a "qu" word); return the rest of s and the result
+		entry for the tickon, or None
+		"""
+		for e in self.tickons:
+			if s.startswith( e['orth'] + "qu" ):
+				return s[len( e['orth'] ):], { 'w' : e }
+
+		return None
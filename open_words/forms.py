@@ -0,0 +1,221 @@
+"""
+forms.py
+
+Full-form analysis table
+
+Every regular surface form is a stem followed by one of the inflection
+endings that apply to it, so the forms can be enumerated ahead of time.
+The table maps each surface form to the inflections (by their number in
+Inflects, sorted by length of ending as in Parse) that combine with some
+stem to spell it; Parse can then answer a word from the table with one
+lookup instead of trying every ending.
+
+The table does not name the stems. Parse finds them with one stem index
+probe per ending in the analysis (the stem is the form minus the
+ending), and that probe always hits. Naming the stems would make nearly
+every form's analysis unique: about 2.8 million analyses for 2.8 million
+forms on the full STEMLIST, against about 4,200 sets of inflection
+numbers. The automaton would then lose the suffix sharing that keeps it
+small.
+
+FormTable keeps the forms in a Python dict, which is quick to build but
+large once every form is enumerated. FormAutomaton stores the same
+mapping in a minimal acyclic automaton (see automaton.py) packed into
+flat arrays, which takes a small fraction of the memory.
+
+Usage:
+
+	python -m open_words.forms [output path]
+
+The file format follows the extension of the output path: ".json" for a
+FormTable, anything else for a FormAutomaton.
+
+"""
+
+import json
+import os
+import struct
+import sys
+from array import array
+
+from open_words.automaton import Automaton
+
+DEFAULT_PATH = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), "data", "forms.fsa" )
+
+AUTOMATON_MAGIC = b"OWFORMS1"
+AUTOMATON_HEADER = struct.Struct("<8sIIIII")
+
+
+def generate_forms(stems, inflects):
+	"""
+	Yield ( form, inflection number ) for every stem combined with every
+	inflection that _check_stems would accept for it: same part of speech
+	(or a participle inflection on a verb stem) and same first n value
+	"""
+	compatible = {}
+	for i, infl in enumerate( inflects ):
+		compatible.setdefault( ( infl['pos'], infl['n'][0] ), [] ).append( ( infl['ending'], i ) )
+		if infl['pos'] == "VPAR":
+			compatible.setdefault( ( "V", infl['n'][0] ), [] ).append( ( infl['ending'], i ) )
+
+	for stem in stems:
+		for ending, i in compatible.get( ( stem['pos'], stem['n'][0] ), [] ):
+			yield stem['orth'] + ending, i
+
+
+class FormTable:
+	"""
+	Surface form -> inflection numbers
+
+	Forms that share the same set of inflections share one analysis
+	tuple, so the table only holds one small id per form
+	"""
+
+	def __init__(self, forms, analyses, inflect_count):
+		self.forms = forms
+		self.analyses = analyses
+		self.inflect_count = inflect_count
+
+	@classmethod
+	def build(cls, stems, inflects):
+		"""Enumerate all forms of the stems; inflects must be sorted as in Parse"""
+		found = {}
+		for form, i in generate_forms( stems, inflects ):
+			found.setdefault( form, set() ).add( i )
+
+		forms = {}
+		analyses = []
+		analysis_ids = {}
+		for form, numbers in found.items():
+			analysis = tuple( sorted( numbers ) )
+			if analysis not in analysis_ids:
+				analysis_ids[analysis] = len( analyses )
+				analyses.append( analysis )
+			forms[form] = analysis_ids[analysis]
+
+		return cls( forms, analyses, len( inflects ) )
+
+	@classmethod
+	def load(cls, path):
+		with open( path ) as f:
+			data = json.load( f )
+
+		return cls( data['forms'], [ tuple( a ) for a in data['analyses'] ], data['inflects'] )
+
+	def save(self, path):
+		with open( path, 'w' ) as out:
+			json.dump( {
+					'inflects' : self.inflect_count,
+					'analyses' : self.analyses,
+					'forms' : self.forms,
+				}, out )
+
+		return
+
+	def get(self, form, default=None):
+		"""Return the inflection numbers for a surface form"""
+		analysis = self.forms.get( form )
+		if analysis is None:
+			return default
+
+		return self.analyses[analysis]
+
+	def __contains__(self, form):
+		return form in self.forms
+
+	def __len__(self):
+		return len( self.forms )
+
+
+class FormAutomaton(FormTable):
+	"""
+	Surface form -> inflection numbers, with the form -> analysis id
+	mapping held in a minimal acyclic automaton
+	"""
+
+	@classmethod
+	def build(cls, stems, inflects):
+		table = FormTable.build( stems, inflects )
+
+		return cls.from_table( table )
+
+	@classmethod
+	def from_table(cls, table):
+		return cls( Automaton.build( table.forms.items() ), table.analyses, table.inflect_count )
+
+	@classmethod
+	def load(cls, path):
+		with open( path, "rb" ) as f:
+			magic, inflect_count, size, states, transitions, analyses_length = AUTOMATON_HEADER.unpack( f.read( AUTOMATON_HEADER.size ) )
+			if magic != AUTOMATON_MAGIC:
+				raise ValueError( "%s is not an open_words form automaton" % path )
+
+			first = array( "I" )
+			first.fromfile( f, states + 1 )
+			labels = array( "I" )
+			labels.fromfile( f, transitions )
+			targets = array( "I" )
+			targets.fromfile( f, transitions )
+			final = bytearray( f.read( states ) )
+			analyses = [ tuple( a ) for a in json.loads( f.read( analyses_length ).decode( "utf-8" ) ) ]
+
+		return cls( Automaton( first, labels, targets, final, size ), analyses, inflect_count )
+
+	def save(self, path):
+		automaton = self.forms
+		analyses = json.dumps( self.analyses ).encode( "utf-8" )
+
+		with open( path, "wb" ) as out:
+			out.write( AUTOMATON_HEADER.pack(
+					AUTOMATON_MAGIC,
+					self.inflect_count,
+					len( automaton ),
+					len( automaton.final ),
+					len( automaton.labels ),
+					len( analyses ),
+				) )
+			automaton.first.tofile( out )
+			automaton.labels.tofile( out )
+			automaton.targets.tofile( out )
+			out.write( automaton.final )
+			out.write( analyses )
+
+		return
+
+	def items(self, prefix=""):
+		"""Yield ( form, inflection numbers ) for every form starting with prefix"""
+		for form, analysis in self.forms.items( prefix ):
+			yield form, self.analyses[analysis]
+
+
+def load_forms(path):
+	"""Load a FormTable or FormAutomaton file"""
+	with open( path, "rb" ) as f:
+		is_automaton = f.read( len( AUTOMATON_MAGIC ) ) == AUTOMATON_MAGIC
+
+	if is_automaton:
+		return FormAutomaton.load( path )
+
+	return FormTable.load( path )
+
+
+def build_form_table(path=DEFAULT_PATH, stems=None, inflects=None):
+	"""Write the full-form table for the open_words stems and inflections"""
+	if stems is None:
+		from open_words.stem_list import Stems as stems
+	if inflects is None:
+		from open_words.inflects import Inflects as inflects
+
+	# Same order as Parse uses: inflections sorted by length of ending
+	inflects = sorted( inflects, key=lambda x: len( x['ending'] ) )
+
+	table = FormTable.build( stems, inflects )
+	if not path.endswith( ".json" ):
+		table = FormAutomaton.from_table( table )
+	table.save( path )
+
+	return path
+
+
+if __name__ == "__main__":
+	print( build_form_table( *sys.argv[1:2] ) )
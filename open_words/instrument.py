@@ -0,0 +1,149 @@
+"""
+instrument.py
+
+Optional per-stage timing for Parse
+
+A StageTimer wraps the stage methods of one Parse instance (only that
+instance, and only while attached) to record the wall time and number of
+calls of each stage, in total and for each parsed word. A parser that
+has no timer attached runs the plain methods, so instrumentation costs
+nothing when it is not used.
+
+Stage times are inclusive: _find_forms includes the _check_stems and
+_lookup_stems calls it makes, and _reduce calls _find_forms again.
+
+Usage:
+
+	timer = StageTimer()
+	with timer.attached( parser ):
+		parser.parse_line( "Sunt geminae Somni portae" )
+
+	timer.report()
+
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+STAGES = (
+	"_split_enclitic",
+	"_find_forms",
+	"_check_stems",
+	"_lookup_stems",
+	"_get_word_endings",
+	"_reduce",
+	"_format_output",
+)
+
+
+class StageTimer:
+	"""
+	Record wall time and call counts per parser stage and per word
+
+	callback, if given, is called after each word as
+	callback( word, seconds, { stage : [ calls, seconds ] } ); the last
+	keep_tokens words are also kept in self.tokens
+	"""
+
+	def __init__(self, stages=STAGES, callback=None, keep_tokens=1000):
+		self.stages = tuple( stages )
+		self.callback = callback
+		self.totals = { stage : [ 0, 0.0 ] for stage in self.stages }
+		self.tokens = deque( maxlen=keep_tokens )
+
+		self._lock = threading.Lock()
+		self._local = threading.local()
+
+	def attach(self, parser):
+		"""Start timing the stages of parser"""
+		parser.parse = self._wrap_parse( parser.parse )
+		for stage in self.stages:
+			setattr( parser, stage, self._wrap_stage( stage, getattr( parser, stage ) ) )
+
+		return parser
+
+	def detach(self, parser):
+		"""Stop timing parser and restore its own methods"""
+		for name in ( "parse", ) + self.stages:
+			parser.__dict__.pop( name, None )
+
+		return parser
+
+	@contextmanager
+	def attached(self, parser):
+		self.attach( parser )
+		try:
+			yield self
+		finally:
+			self.detach( parser )
+
+	def reset(self):
+		with self._lock:
+			self.totals = { stage : [ 0, 0.0 ] for stage in self.stages }
+			self.tokens.clear()
+
+		return
+
+	def report(self):
+		"""Totals per stage and the recorded words, as plain data"""
+		with self._lock:
+			return {
+					'stages' : {
+							stage : { 'calls' : calls, 'seconds' : seconds }
+							for stage, ( calls, seconds ) in self.totals.items()
+						},
+					'tokens' : [
+							{ 'word' : word, 'seconds' : seconds, 'stages' : stages }
+							for word, seconds, stages in self.tokens
+						],
+				}
+
+	def _wrap_parse(self, parse):
+		local = self._local
+
+		def timed_parse(input_string, *args, **kwargs):
+			# Nested parse calls belong to the outer word
+			outer = getattr( local, 'stages', None )
+			if outer is not None:
+				return parse( input_string, *args, **kwargs )
+
+			local.stages = {}
+			start = time.perf_counter()
+			try:
+				return parse( input_string, *args, **kwargs )
+			finally:
+				seconds = time.perf_counter() - start
+				stages = local.stages
+				local.stages = None
+
+				with self._lock:
+					self.tokens.append( ( input_string, seconds, stages ) )
+				if self.callback is not None:
+					self.callback( input_string, seconds, stages )
+
+		return timed_parse
+
+	def _wrap_stage(self, stage, method):
+		local = self._local
+
+		def timed_stage(*args, **kwargs):
+			start = time.perf_counter()
+			try:
+				return method( *args, **kwargs )
+			finally:
+				seconds = time.perf_counter() - start
+
+				with self._lock:
+					total = self.totals[stage]
+					total[0] += 1
+					total[1] += seconds
+
+				stages = getattr( local, 'stages', None )
+				if stages is not None:
+					counts = stages.setdefault( stage, [ 0, 0.0 ] )
+					counts[0] += 1
+					counts[1] += seconds
+
+		return timed_stage
@@ -0,0 +1,380 @@
+"""
+lexicon.py
+
+Read the precompiled binary lexicon written by build_lexicon.py
+
+The file is memory-mapped and records are only decoded when they are
+looked up, so loading a Parse from it does not need to import the large
+Python literal modules (dict_line, stem_list, inflects, ...).
+
+File layout (all integers little-endian):
+
+	header     magic (8 bytes), format version (uint32), section count (uint32)
+	directory  one entry per section: name (8 bytes), offset (uint64), length (uint64)
+	sections   8-byte aligned blobs named in the directory
+
+Sections:
+
+	meta       JSON: addon categories and inflection ending lengths
+	strings    UTF-8 string pool
+	lists      uint32 pairs (offset, length) into the string pool, used by list fields
+	words, stems, inflects, uniques, addons
+	           fixed-width record tables: two uint32 per field
+	ix_words   uint32 array: word id -> word record number + 1 (0 if missing)
+	ix_stems, ix_infl, ix_uniq
+	           open addressing hash indexes: string key -> record numbers
+
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from open_words.records import Word, Stem, Inflect, Unique
+
+MAGIC = b"OWLEXICO"
+VERSION = 1
+
+HEADER = struct.Struct("<8sII")
+DIRECTORY_ENTRY = struct.Struct("<8sQQ")
+
+# Marks a field that is not present on a record
+MISSING = 0xFFFFFFFF
+
+# Record schemas: field name and kind
+#   int  - (value, 0)
+#   str  - (offset, length) into the string pool
+#   list - (offset, count) into the lists table, each item a string
+#   n    - like list, but items that look like integers are decoded as int
+WORD_FIELDS = (
+	('id', 'int'),
+	('orth', 'str'),
+	('parts', 'list'),
+	('pos', 'str'),
+	('form', 'str'),
+	('n', 'n'),
+	('senses', 'list'),
+)
+
+STEM_FIELDS = (
+	('orth', 'str'),
+	('pos', 'str'),
+	('form', 'str'),
+	('n', 'n'),
+	('wid', 'int'),
+)
+
+INFLECT_FIELDS = (
+	('ending', 'str'),
+	('pos', 'str'),
+	('note', 'str'),
+	('n', 'n'),
+	('form', 'str'),
+)
+
+UNIQUE_FIELDS = (
+	('orth', 'str'),
+	('pos', 'str'),
+	('form', 'str'),
+	('senses', 'list'),
+)
+
+ADDON_FIELDS = (
+	('orth', 'str'),
+	('pos', 'str'),
+	('form', 'str'),
+	('senses', 'list'),
+)
+
+# Size of one hash index slot: key offset, key length, postings offset, postings count
+SLOT_WIDTH = 4
+
+DEFAULT_PATH = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), "data", "lexicon.bin" )
+
+
+def hash_key(key):
+	"""Hash a UTF-8 encoded key for the on-disk indexes"""
+	return zlib.crc32( key )
+
+
+class LexiconError(ValueError):
+	"""Raised when a lexicon file is missing sections or has the wrong format"""
+	pass
+
+
+class RecordTable:
+	"""
+	Read-only sequence of records stored in a fixed-width table
+
+	Records are decoded (to record_class, or to dicts if it is None) the
+	first time they are read and then kept, so repeated lookups return the
+	same object
+	"""
+
+	def __init__(self, lexicon, name, fields, record_class=None):
+		self.lexicon = lexicon
+		self.fields = fields
+		self.record_class = record_class
+		self.width = 2 * len( fields )
+		self._cells = lexicon._section_ints( name )
+		self._cache = {}
+
+	def __len__(self):
+		return len( self._cells ) // self.width
+
+	def __getitem__(self, i):
+		if isinstance( i, slice ):
+			return [ self[j] for j in range( *i.indices( len( self ) ) ) ]
+
+		if i < 0:
+			i += len( self )
+		if not 0 <= i < len( self ):
+			raise IndexError( "record index out of range" )
+
+		record = self._cache.get( i )
+		if record is None:
+			record = self._decode( i )
+			self._cache[i] = record
+
+		return record
+
+	def __iter__(self):
+		for i in range( len( self ) ):
+			yield self[i]
+
+	def _decode(self, i):
+		cells = self._cells
+		base = i * self.width
+		record = {}
+
+		for f, ( name, kind ) in enumerate( self.fields ):
+			a = cells[base + 2 * f]
+			b = cells[base + 2 * f + 1]
+
+			if a == MISSING:
+				continue
+
+			if kind == 'int':
+				record[name] = a
+			elif kind == 'str':
+				record[name] = self.lexicon.string( a, b )
+			elif kind == 'list':
+				record[name] = self.lexicon.string_list( a, b )
+			else:
+				record[name] = [ _decode_n( v ) for v in self.lexicon.string_list( a, b ) ]
+
+		if self.record_class is not None:
+			record = self.record_class.from_dict( record, self.lexicon._shared )
+
+		return record
+
+
+class HashIndex:
+	"""
+	Read-only string key -> record numbers index stored as an open
+	addressing hash table with linear probing
+	"""
+
+	def __init__(self, lexicon, name):
+		self.lexicon = lexicon
+		cells = lexicon._section_ints( name )
+		self.size = cells[0]
+		self._slots = cells[1:1 + self.size * SLOT_WIDTH]
+		self._postings = cells[1 + self.size * SLOT_WIDTH:]
+
+	def postings(self, key):
+		"""Return the record numbers stored for key, or an empty tuple"""
+		if not self.size:
+			return ()
+
+		key = key.encode( "utf-8" )
+		mask = self.size - 1
+		slot = hash_key( key ) & mask
+
+		while True:
+			base = slot * SLOT_WIDTH
+			count = self._slots[base + 3]
+			if count == 0:
+				return ()
+
+			length = self._slots[base + 1]
+			if length == len( key ) and self.lexicon.string_bytes( self._slots[base], length ) == key:
+				start = self._slots[base + 2]
+				return self._postings[start:start + count]
+
+			slot = ( slot + 1 ) & mask
+
+	def __contains__(self, key):
+		return len( self.postings( key ) ) > 0
+
+	def keys(self):
+		"""Iterate over the keys in the index, in slot order"""
+		for slot in range( self.size ):
+			base = slot * SLOT_WIDTH
+			if self._slots[base + 3]:
+				yield self.lexicon.string( self._slots[base], self._slots[base + 1] )
+
+
+class RecordIndex:
+	"""Index that returns the records for a key as a list, like the in-memory index in Parse"""
+
+	def __init__(self, index, table):
+		self.index = index
+		self.table = table
+
+	def get(self, key, default=None):
+		found = self.index.postings( key )
+		if not found:
+			return default
+
+		return [ self.table[i] for i in found ]
+
+	def __contains__(self, key):
+		return key in self.index
+
+	def keys(self):
+		return self.index.keys()
+
+
+class GroupedIndex(RecordIndex):
+	"""
+	Index that groups the records for a key by (pos, n[0]), matching the
+	inflection index built by Parse
+	"""
+
+	def get(self, key, default=None):
+		found = self.index.postings( key )
+		if not found:
+			return default
+
+		groups = {}
+		for i in found:
+			record = self.table[i]
+			groups.setdefault( ( record['pos'], record['n'][0] ), [] ).append( record )
+
+		return groups
+
+
+class WordIndex:
+	"""Word id -> dictionary entry, addressed directly by id"""
+
+	def __init__(self, lexicon, table):
+		self.table = table
+		self._ids = lexicon._section_ints( "ix_words" )
+
+	def get(self, wid, default=None):
+		if not 0 <= wid < len( self._ids ):
+			return default
+
+		i = self._ids[wid]
+		if i == 0:
+			return default
+
+		return self.table[i - 1]
+
+	def __contains__(self, wid):
+		return self.get( wid ) is not None
+
+
+class Lexicon:
+	"""
+	Memory-mapped lexicon file
+
+	Exposes the same data that Parse otherwise loads from the literal
+	modules (words, stems, inflects, uniques, addons) plus the prebuilt
+	lookup indexes
+	"""
+
+	def __init__(self, path=DEFAULT_PATH):
+		if sys.byteorder != "little":
+			raise LexiconError( "The binary lexicon can only be read on little-endian hosts" )
+
+		self.path = path
+
+		with open( path, "rb" ) as f:
+			if os.fstat( f.fileno() ).st_size < HEADER.size:
+				raise LexiconError( "%s is not an open_words lexicon file" % path )
+			self._mm = mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ )
+
+		magic, version, count = HEADER.unpack_from( self._mm, 0 )
+		if magic != MAGIC:
+			raise LexiconError( "%s is not an open_words lexicon file" % path )
+		if version != VERSION:
+			raise LexiconError( "%s has lexicon format version %d, expected %d" % ( path, version, VERSION ) )
+		if HEADER.size + count * DIRECTORY_ENTRY.size > len( self._mm ):
+			raise LexiconError( "%s is truncated" % path )
+
+		self._sections = {}
+		for i in range( count ):
+			name, offset, length = DIRECTORY_ENTRY.unpack_from( self._mm, HEADER.size + i * DIRECTORY_ENTRY.size )
+			self._sections[name.rstrip( b"\0" ).decode( "ascii" )] = ( offset, length )
+
+		self.meta = json.loads( self._section_bytes( "meta" ).decode( "utf-8" ) )
+		self._strings = self._section( "strings" )
+		self._lists = self._section_ints( "lists" )
+
+		# Record tables (values repeated across records are shared through _shared)
+		self._shared = {}
+		self.words = RecordTable( self, "words", WORD_FIELDS, Word )
+		self.stems = RecordTable( self, "stems", STEM_FIELDS, Stem )
+		self.inflects = RecordTable( self, "inflects", INFLECT_FIELDS, Inflect )
+		self.uniques = RecordTable( self, "uniques", UNIQUE_FIELDS, Unique )
+		self._addon_table = RecordTable( self, "addons", ADDON_FIELDS )
+		self._addons = None
+
+		# Indexes
+		self.dict_index = WordIndex( self, self.words )
+		self.stem_index = RecordIndex( HashIndex( self, "ix_stems" ), self.stems )
+		self.inflect_index = GroupedIndex( HashIndex( self, "ix_infl" ), self.inflects )
+		self.unique_index = RecordIndex( HashIndex( self, "ix_uniq" ), self.uniques )
+		self.ending_lengths = self.meta['ending_lengths']
+
+	@property
+	def addons(self):
+		"""Addons grouped by category, in the same shape as LatinAddons"""
+		if self._addons is None:
+			self._addons = {}
+			for category, start, count in self.meta['addons']:
+				self._addons[category] = self._addon_table[start:start + count]
+
+		return self._addons
+
+	def string_bytes(self, offset, length):
+		return self._strings[offset:offset + length].tobytes()
+
+	def string(self, offset, length):
+		return str( self._strings[offset:offset + length], "utf-8" )
+
+	def string_list(self, offset, count):
+		lists = self._lists
+		return [
+				self.string( lists[2 * i], lists[2 * i + 1] )
+				for i in range( offset, offset + count )
+			]
+
+	def _section(self, name):
+		if name not in self._sections:
+			raise LexiconError( "%s has no %s section" % ( self.path, name ) )
+
+		offset, length = self._sections[name]
+		if offset + length > len( self._mm ):
+			raise LexiconError( "%s is truncated" % self.path )
+
+		return memoryview( self._mm )[offset:offset + length]
+
+	def _section_bytes(self, name):
+		return self._section( name ).tobytes()
+
+	def _section_ints(self, name):
+		return self._section( name ).cast( "I" )
+
+
+def _decode_n(v):
+	"""Decode an item of an n list the way format_data.py parsed it"""
+	try:
+		return int( v )
+	except ValueError:
+		return v
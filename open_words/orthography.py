@@ -0,0 +1,113 @@
+"""
+orthography.py
+
+Spelling normalization for lookups
+
+Latin texts spell the same word with u or v, i or j, ae or e, with or
+without macrons. Rather than trying every variant of a word at query
+time, the stem, unique and ending indexes are keyed by a normalized
+spelling, computed once when the indexes are built, and every word is
+normalized the same way before it is looked up; one probe then covers
+all the variants.
+
+Enclitics and prefix/suffix addons are split from the word as it is
+spelled, and only what is left is normalized. Enclitics spelled as
+variants (armaue for armave) are split too, but only if the word finds
+nothing as it is: folded, -ve and -vis would otherwise split ordinary
+words such as tenue and suis.
+
+Strict matching (no normalization) is the default. Folding ae to e is
+available but off in FOLDED, and it only applies to stems and uniques:
+inflection endings are matched as they are spelled, so the -ae and -e
+endings are never confused (angustae is not read as angust-e), and an
+ae at the end of a stem is kept, since it would otherwise fold into an
+-e adverb or ending. The medieval -e for the ending -ae is therefore
+not recognized.
+
+"""
+
+import re
+import unicodedata
+
+# ae, except at the end of a stem
+AE = re.compile( r"ae(?!$)" )
+
+
+class Orthography:
+	"""
+	Spelling normalization: strip_diacritics removes macrons, breves
+	and diaereses, fold_uv maps v to u, fold_ij maps j to i and fold_ae
+	maps ae to e in stems (see above)
+	"""
+
+	def __init__(self, strip_diacritics=False, fold_uv=False, fold_ij=False, fold_ae=False):
+		self.strip_diacritics = strip_diacritics
+		self.fold_uv = fold_uv
+		self.fold_ij = fold_ij
+		self.fold_ae = fold_ae
+
+		folds = {}
+		if fold_uv:
+			folds[ord( "v" )] = "u"
+			folds[ord( "V" )] = "U"
+		if fold_ij:
+			folds[ord( "j" )] = "i"
+			folds[ord( "J" )] = "I"
+		self._folds = folds
+
+	@property
+	def name(self):
+		"""Canonical name of the normalization, stored with lexicons built with it"""
+		options = [
+				name for name, enabled in (
+						( "diacritics", self.strip_diacritics ),
+						( "uv", self.fold_uv ),
+						( "ij", self.fold_ij ),
+						( "ae", self.fold_ae ),
+					)
+				if enabled
+			]
+
+		return "+".join( options ) or "strict"
+
+	@property
+	def strict(self):
+		return self.name == "strict"
+
+	def normalize(self, s):
+		"""Return the normalized spelling of a stem or of a whole word"""
+		s = self.normalize_letters( s )
+
+		if self.fold_ae:
+			s = AE.sub( "e", s )
+
+		return s
+
+	def normalize_letters(self, s):
+		"""Return s with the diacritics, u/v and i/j normalized (no ae/e), as inflection endings are matched"""
+		if self.strip_diacritics and not s.isascii():
+			s = "".join( c for c in unicodedata.normalize( "NFD", s ) if not unicodedata.combining( c ) )
+
+		if self._folds:
+			s = s.translate( self._folds )
+
+		return s
+
+	def __eq__(self, other):
+		if not isinstance( other, Orthography ):
+			return NotImplemented
+
+		return self.name == other.name
+
+	def __hash__(self):
+		return hash( self.name )
+
+	def __repr__(self):
+		return "Orthography(%s)" % self.name
+
+
+# Exact spellings only
+STRICT = Orthography()
+
+# Diacritics, u/v and i/j variants (but not ae/e) match
+FOLDED = Orthography( strip_diacritics=True, fold_uv=True, fold_ij=True )
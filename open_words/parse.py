@@ -9,31 +9,258 @@ definition
 __author__ = "Luke Hollis <luke@archimedes.digital>"
 __license__ = "MIT License. See LICENSE."
 
+import os
 import string
 import re
+import sys
+import threading
 import pdb
-from copy import deepcopy
-from open_words.dict_line import WordsDict
-from open_words.addons import LatinAddons
-from open_words.stem_list import Stems
-from open_words.uniques import Uniques
-from open_words.inflects import Inflects
+from open_words.lexicon import Lexicon, DEFAULT_PATH as LEXICON_PATH
+from open_words.records import Word, Stem, Inflect, Unique, Lemma, compact
+from open_words.forms import FormTable, load_forms
+from open_words.cache import ReferenceCache, ResultCache
+from open_words.enclitics import EncliticSplitter
+from open_words.affixes import AffixTrie
+from open_words.prefilter import UnknownFilter
+from open_words.tokenizer import Tokenizer
+from open_words.orthography import STRICT
+
+# Number of reduced word bases whose matches are kept
+REDUCED_CACHE_SIZE = 10000
+
+# Literal data modules whose rows are compacted into records on load
+DATA_MODULES = (
+		"open_words.dict_line",
+		"open_words.stem_list",
+		"open_words.uniques",
+		"open_words.inflects",
+	)
+
+# Abbreviations used in the inflection forms
+DECLENSIONS = {
+	'NOM' : "nominative",
+	'VOC' : "vocative",
+	'GEN' : "genitive",
+	'DAT' : "dative",
+	'ACC' : "accusative",
+	'LOC' : "locative",
+	'ABL' : "ablative",
+	'X' : ""
+}
+
+NUMBERS = {
+	'S' : "singular",
+	'P' : "plural",
+	'X' : ""
+}
+
+GENDERS = {
+	'M' : "masculine",
+	'F' : "feminine",
+	'N' : "neuter",
+	'C' : "C",
+	'X' : ""
+}
+
+MOODS = {
+	'IND' : "indicative",
+	'SUB' : "subjunctive",
+	'IMP' : "imperative",
+	'INF' : "infinitive",
+	'X' : ""
+}
+
+VOICES = {
+	'ACTIVE' : "active",
+	'PASSIVE' : "passive",
+	'X' : ""
+}
+
+TENSES = {
+	'PRES' : "present",
+	'IMPF' : "imperfect",
+	'PERF' : "perfect",
+	'FUT' : "future",
+	'FUTP' : "future perfect",
+	'PLUP' : "pluperfect",
+	'INF' : "infinitive",
+	'X' : ""
+}
+
+# Part of speech names in the formatted output; other parts of speech are kept as they are
+# (PREP has always been output as "adjective")
+POS_NAMES = {
+	'N' : "noun",
+	'V' : "verb",
+	'VPAR' : "participle",
+	'ADJ' : "adjective",
+	'PREP' : "adjective",
+	'PRON' : "pronoun",
+	'INTERJ' : "interjection",
+	'NUM' : "number",
+	'CONJ' : "conjunction",
+}
 
 
 class Parse:
 
-	def __init__(self, words_dict=WordsDict, addons=LatinAddons, stems=Stems, uniques=Uniques, inflects=Inflects ):
-		"""Provide a modular structure for loading the parser data"""
+	def __init__(self, words_dict=None, addons=None, stems=None, uniques=None, inflects=None, lexicon=None, forms=None, cache_size=None, cache_bytes=None, filter_fp_rate=None, negative_cache_size=10000, tokenizer=None, orthography=None ):
+		"""
+		Provide a modular structure for loading the parser data
+
+		Data that is not passed in is loaded from the open_words data
+		modules, unless a precompiled lexicon (a Lexicon or the path of a
+		file written by build_lexicon.py) is given; then the data and its
+		indexes are read lazily from the memory-mapped file. If no data is
+		passed in at all, open_words/data/lexicon.bin is used if it has
+		been built
+
+		If a full-form table (a FormTable, a FormAutomaton or the path of a
+		file written by forms.py) is given, words are looked up in it
+		directly instead of trying each inflection ending; the stems of
+		a found form are then read from the stem index, one probe per
+		matching ending (see forms.py)
+
+		Results of parse and latin_to_english are cached (LRU) if a bound
+		is given, in entries (cache_size) and/or bytes (cache_bytes); see
+		self.cache.cache_info() and clear_caches()
+
+		If filter_fp_rate is given, tokens that cannot match anything are
+		rejected up front by a Bloom filter over the stems (with that
+		false-positive rate) and a cache of the last negative_cache_size
+		tokens that gave no result; see self.prefilter.filter_info()
+
+		Texts (parse_line, iter_parse, parse_document) are split into words
+		by tokenizer, a Tokenizer (see tokenizer.py); by default words are
+		lowercased and stripped of macrons and other diacritics
+
+		orthography (see orthography.py) normalizes the spellings of the
+		index keys and of the words looked up, so that e.g. u/v and i/j
+		variants match; by default spellings must match exactly
+		"""
+
+		# Useful for sanitizing string for parsing
+		self.punctuation_transtable = {ord(c): " " for c in string.punctuation}
+
+		# Splits texts into words
+		if tokenizer is None:
+			tokenizer = Tokenizer()
+		self.tokenizer = tokenizer
+
+		# Spelling normalization of index keys and words (None for strict matching)
+		if orthography is None:
+			orthography = STRICT
+		self.orthography = orthography
+		self._normalize = None if orthography.strict else orthography.normalize
+		self._normalize_letters = None if orthography.strict else orthography.normalize_letters
+		# (stems are folded further than words and endings only with ae/e folding)
+		self._fold_stems = orthography.normalize if orthography.fold_ae else None
+
+		# Work shared between the words of one parse_many batch (per thread)
+		self._batch = threading.local()
+
+		# Endings of the principal parts, by ( pos, n, which parts are filled in )
+		self._part_endings = {}
+
+		# Decoded morphology of each inflection form, by ( form, pos )
+		self._morphology = {}
+
+		# Importing the literal data modules costs far more memory than the
+		# records they are loaded into, so prefer the precompiled lexicon
+		if lexicon is None and all( data is None for data in ( words_dict, addons, stems, uniques, inflects ) ) and os.path.exists( LEXICON_PATH ):
+			lexicon = LEXICON_PATH
+
+		if lexicon is not None:
+			self._load_lexicon( lexicon )
+		else:
+			self._load_data( words_dict, addons, stems, uniques, inflects )
+
+		# Enclitic tables and affix tries, compiled from the addons
+		self.enclitics = EncliticSplitter( self.addons )
+		# (with a non-strict orthography, also tables that match variant spellings, e.g. -ue for -ve)
+		self.variant_enclitics = None if orthography.strict else EncliticSplitter( self.addons, orthography.normalize_letters )
+		self.prefix_trie = AffixTrie( self.addons['prefixes'] )
+		self.suffix_trie = AffixTrie( self.addons['suffixes'], reverse=True )
+
+		# Matches of the bases of reduced words (shared by the results, so never changed)
+		self._reduced = ReferenceCache( REDUCED_CACHE_SIZE )
+
+		# Full-form table
+		if forms is not None and not isinstance( forms, FormTable ):
+			forms = load_forms( forms )
+		if forms is not None and forms.inflect_count != len( self.inflects ):
+			raise ValueError( "The full-form table was built for a different list of inflections" )
+		if forms is not None and self._normalize is not None:
+			raise ValueError( "The full-form table can only be used with strict orthography" )
+		self.forms = forms
+
+		# Result cache
+		self.cache = None
+		if cache_size is not None or cache_bytes is not None:
+			self.cache = ResultCache( cache_size, cache_bytes )
+
+		# Filter for unknown tokens
+		self.prefilter = None
+		if filter_fp_rate is not None:
+			self.prefilter = UnknownFilter( self.stem_index.keys(), self.inflect_index.keys(), filter_fp_rate, negative_cache_size, self._fold_stems )
+
+		return
+
+	def _load_lexicon(self, lexicon):
+		"""Use the data and prebuilt indexes of a binary lexicon file"""
+		if not isinstance( lexicon, Lexicon ):
+			lexicon = Lexicon( lexicon )
 
 		# Parser data
-		self.dict = words_dict
+		self.lexicon = lexicon
+		self.dict = lexicon.words
+		self.addons = lexicon.addons
+		self.stems = lexicon.stems
+		self.uniques = lexicon.uniques
+		# (inflections are stored sorted by length of ending)
+		self.inflects = lexicon.inflects
+
+		# Indexes; if the file was built for another orthography, rebuild them in memory
+		self.dict_index = lexicon.dict_index
+		if lexicon.meta.get( 'orthography', STRICT.name ) == self.orthography.name:
+			self.stem_index = lexicon.stem_index
+			self.inflect_index = lexicon.inflect_index
+			self.ending_lengths = lexicon.ending_lengths
+			self.unique_index = lexicon.unique_index
+		else:
+			self._build_indexes()
+
+		return
+
+	def _load_data(self, words_dict, addons, stems, uniques, inflects):
+		"""Load the parser data from Python data and build the indexes"""
+		loaded = set( sys.modules )
+
+		if words_dict is None:
+			from open_words.dict_line import WordsDict as words_dict
+		if addons is None:
+			from open_words.addons import LatinAddons as addons
+		if stems is None:
+			from open_words.stem_list import Stems as stems
+		if uniques is None:
+			from open_words.uniques import Uniques as uniques
+		if inflects is None:
+			from open_words.inflects import Inflects as inflects
+
+		# Parser data, as compact read-only records (addons are kept as they are)
+		shared = {}
+		self.lexicon = None
+		self.dict = compact( words_dict, Word, shared )
 		self.addons = addons
-		self.stems = stems
-		self.uniques = uniques
-		self.inflects = inflects
+		self.stems = compact( stems, Stem, shared )
+		self.uniques = compact( uniques, Unique, shared )
+		self.inflects = compact( inflects, Inflect, shared )
 
-		# Useful for sanitizing string for parsing
-		self.punctuation_transtable = {ord(c): " " for c in string.punctuation}
+		# The records replace the rows of the literal modules; unload the
+		# modules imported here so that their lists can be freed
+		for name in DATA_MODULES:
+			if name not in loaded:
+				_unload_module( name )
 
 		# Sort by length
 		self.stems.sort(key=len)
@@ -41,17 +268,153 @@ class Parse:
 		# Sort by length of ending
 		self.inflects.sort(key=lambda x: len(x['ending']))
 
+		# Index dictionary entries by word id
+		self.dict_index = { word['id'] : word for word in self.dict }
+
+		self._build_indexes()
+
 		return
 
+	def _build_indexes(self):
+		"""Build the stem, inflection and unique indexes, keyed by normalized spelling"""
+		# Index stems by orth
+		self.stem_index = self._index_stems( self.stems )
+
+		# Index inflections by ending, then by part of speech and first n value
+		self.inflect_index = self._index_inflects( self.inflects )
+		self.ending_lengths = sorted( set( len( ending ) for ending in self.inflect_index ) )
+
+		# Index uniques by orth; several uniques may share a spelling
+		self.unique_index = {}
+		for u in self.uniques:
+			self.unique_index.setdefault( self._index_key( u['orth'] ), [] ).append( u )
+
+		return
+
+	def _index_key(self, s):
+		"""Spelling of a stem or a unique (or a whole word looked up as one) in the indexes"""
+		if self._normalize is None:
+			return s
+
+		return self._normalize( s )
+
+	def _word_key(self, s):
+		"""Spelling of a word, or of an inflection ending, for matching endings"""
+		if self._normalize_letters is None:
+			return s
+
+		return self._normalize_letters( s )
+
+	def _index_stems(self, stems):
+		"""
+		Build the stem lookup table used by _check_stems:
+		{ orth : ( stem, ... ) }, preserving stem order
+
+		Most spellings have a single stem, so the stems are only grouped
+		by part of speech and n[0] when they are looked up
+		"""
+		index = {}
+
+		for stem in stems:
+			index.setdefault( self._index_key( stem['orth'] ), [] ).append( stem )
+
+		return { orth : tuple( group ) for orth, group in index.items() }
+
+	def _group_stems(self, stems):
+		"""Group the stems of one spelling by (pos, n[0])"""
+		buckets = {}
+
+		for stem in stems:
+			buckets.setdefault( ( stem['pos'], stem['n'][0] ), [] ).append( stem )
+
+		return buckets
+
+	def _index_inflects(self, inflects):
+		"""
+		Build the ending lookup table used by _match_inflects:
+		{ ending : { (pos, n[0]) : [ infl, ... ] } }, preserving inflection order
+		"""
+		index = {}
+
+		for infl in inflects:
+			groups = index.setdefault( self._word_key( infl['ending'] ), {} )
+			groups.setdefault( ( infl['pos'], infl['n'][0] ), [] ).append( infl )
+
+		return index
+
 	def parse_line(self, line):
 		"""Parse a line of words delimited by spaces"""
 		out = []
-		line = self.sanitize( line )
-		for word in line.split(" "):
-			if len(word):
-				out.append( self.parse( word ) )
+		for word in self.tokenizer.words( line ):
+			out.append( self.parse( word ) )
 		return out
 
+	def iter_parse(self, lines, direction="latin_to_english", formatted=True):
+		"""
+		Parse an iterable of lines (e.g. an open file) lazily
+
+		Yield ( line number, offset of the word in the line, result ) for
+		each word, one line at a time, so only the current line is held in
+		memory
+		"""
+		for line_number, line in enumerate( lines, 1 ):
+			for word, start, end in self.tokenizer.tokenize( line ):
+				yield line_number, start, self.parse( word, direction, formatted )
+
+	def parse_document(self, text, direction="latin_to_english", formatted=True):
+		"""Parse a text of words delimited by spaces as one batch (see parse_many)"""
+		return self.parse_many( self.tokenizer.words( text ), direction, formatted )
+
+	def parse_many(self, words, direction="latin_to_english", formatted=True):
+		"""
+		Parse a list of words, analysing each distinct word only once
+
+		Return one result per word, in the order of the input; repeated
+		words share the same result object. Intermediate work that does not
+		depend on the whole word (the inflection index lookup of each
+		ending) is also shared in the batch.
+		"""
+		words = list( words )
+		results = {}
+
+		# Batches on the same thread (nested calls) share one set of memos
+		is_outer_batch = getattr( self._batch, 'memos', None ) is None
+		if is_outer_batch:
+			self._batch.memos = {}
+
+		try:
+			for word in words:
+				if word not in results:
+					results[word] = self.parse( word, direction, formatted )
+		finally:
+			if is_outer_batch:
+				self._batch.memos = None
+
+		return [ results[word] for word in words ]
+
+	def clear_caches(self):
+		"""
+		Drop the cached results, the matches of reduced words and the
+		prefilter's recently failed tokens, e.g. after changing the data
+		"""
+		if self.cache is not None:
+			self.cache.clear()
+
+		self._reduced.clear()
+
+		if self.prefilter is not None:
+			self.prefilter.clear()
+
+		return
+
+	def _batch_memo(self, name):
+		"""Return the named memo of the current parse_many batch, or None outside of one"""
+		memos = getattr( self._batch, 'memos', None )
+		if memos is None:
+			return None
+
+		return memos.setdefault( name, {} )
+
 	def parse(self, input_string, direction="latin_to_english", formatted=True):
 		"""
 		Parse an input string as a Latin word and look it up in the Words dictionary.
@@ -60,13 +423,19 @@ class Parse:
 		Words program.
 
 		"""
+		if self.cache is not None:
+			key = ( input_string, direction, formatted )
+			cached = self.cache.get( key )
+			if cached is not None:
+				return cached
+
 		out = []
 
 		s = input_string
 
 		# Do the lookup based on the direction of the parse
 		if direction == "latin_to_english":
-			out = self.latin_to_english(s)
+			out = self._latin_to_english( s )
 
 		else:
 			out = self.english_to_latin(s)
@@ -74,51 +443,169 @@ class Parse:
 		if formatted:
 			out = self._format_output(out)
 
-		return { 'word' : s, 'defs' : out }
+		out = { 'word' : s, 'defs' : out }
+
+		if self.cache is not None:
+			self.cache.put( key, out )
+
+		return out
 
 	def latin_to_english(self, s):
 		"""Find definition and word formation from Latin word"""
-		is_unique = False
+		if self.cache is not None:
+			key = ( s, "latin_to_english", None )
+			cached = self.cache.get( key )
+			if cached is not None:
+				return cached
+
+		out = self._latin_to_english( s )
+
+		if self.cache is not None:
+			self.cache.put( key, out )
+
+		return out
+
+	def _latin_to_english(self, s):
+		"""
+		Find definition and word formation from Latin word (uncached)
+
+		Addons are split from the word as it is spelled; only what is left
+		is normalized for the unique, stem and ending lookups. Enclitics
+		spelled as variants (-ue for -ve) are only split if the word
+		finds nothing as it is, since tenue or suis are not tenu-ve or
+		su-vis; likewise a word that is found as it is is not reduced after
+		splitting an enclitic
+		"""
 		out = []
 
+		# Skip tokens that cannot match anything
+		if self.prefilter is not None and self.prefilter.rejects( s, self._could_match ):
+			return out
+
 		# Split enclitics
-		s, out = self._split_enclitic( s )
+		word, out = self._split_enclitic( s )
+		splits = [ ( word, out ) ]
+
+		variant = self._split_variant_enclitic( s, word )
+		if variant is not None:
+			splits.append( variant )
+
+		if len( splits ) == 1 and word == s:
+			out = self._find_word( word, out )
+		else:
+			# Direct matches first, also of the unsplit word (allegorice is not allegori-ce), then tickons and reductions
+			unsplit = [ ( s, [] ) ] if word != s else []
+			out = (
+					self._find_split( splits + unsplit, False )
+					or self._find_split( splits, True )
+				)
+
+		if self.prefilter is not None and not out:
+			self.prefilter.add_failure( s )
+
+		return out
+
+	def _find_word(self, word, out, fallbacks=True):
+		"""
+		Look up a word split from its enclitics (whose result entries are
+		in out) among the uniques, then its forms
+		"""
+		is_unique = False
 
 		# Check against list of uniques
-		for u in self.uniques:
-			if s == u['orth']:
-				out.append({'w':u, 'stems':[]})
-				is_unique = True
-				break
+		for u in self.unique_index.get( self._index_key( word ), [] ):
+			out.append({'w':u, 'stems':[]})
+			is_unique = True
 
 		# If it's not in the list of uniques
 		if not is_unique:
-			out = self._find_forms( s )
+			out = self._find_forms( word, fallbacks=fallbacks )
 
 		return out
 
+	def _find_split(self, splits, fallbacks):
+		"""Return the result of the first ( word, enclitic entries ) of splits that finds anything"""
+		for word, out in splits:
+			out = self._find_word( word, list( out ), fallbacks )
+			if out:
+				return out
+
+		return []
+
+	def _split_variant_enclitic(self, s, word):
+		"""
+		Split enclitics spelled as variants from s; return ( rest, result
+		entries ), or None if that splits no more than word was split
+		"""
+		if self.variant_enclitics is None:
+			return None
+
+		variant = self.variant_enclitics.split( s )
+		if variant[0] == word:
+			return None
+
+		return variant
+
+	def _could_match(self, s):
+		"""
+		Cheap check for the prefilter that follows the same steps as
+		_latin_to_english; False only if that would certainly find nothing
+		"""
+		word, enclitics = self.enclitics.split( s )
+		if self._could_match_word( word ):
+			return True
+
+		# The unsplit word is only looked up directly
+		if word != s and ( self._index_key( s ) in self.unique_index or self.prefilter.could_be_form( self._word_key( s ) ) ):
+			return True
+
+		variant = self._split_variant_enclitic( s, word )
+
+		return variant is not None and self._could_match_word( variant[0] )
+
+	def _could_match_word(self, s):
+		"""_could_match for a word split from its enclitics"""
+		key = self._word_key( s )
+
+		if self._index_key( s ) in self.unique_index:
+			return True
+
+		could_be_form = self.prefilter.could_be_form
+		if could_be_form( key ):
+			return True
+
+		split = self.enclitics.split_tickon( s )
+		if split is not None and self._could_match( split[0] ):
+			return True
+
+		for base in self._reductions( s ):
+			if could_be_form( self._word_key( base ) ):
+				return True
+
+		return False
+
 	def english_to_latin(self, s):
 		"""Find definition and word formation from English word"""
 		out = []
 		print(" -- Still need to build English to Latin")
 		return out
 
-	def _find_forms(self, s, reduced=False):
-		infls = []
+	def _find_forms(self, s, reduced=False, fallbacks=True):
+		"""
+		Find the forms of s; unless reduced or told not to (fallbacks),
+		split a tickon or reduce the word if nothing is found
+		"""
 		out = []
+		key = self._word_key( s )
 
-		# Check against inflection list
-		for infl in self.inflects:
-			if s.endswith( infl['ending'] ):
-
-				# If we've already found the longest inflection
-				if len( infls ) > 0 and ( len( infls[0]['ending'] ) > len( infl['ending'] ) ):
-						break
-				else:
-					infls.append( infl )
+		# Check against the full-form table or the inflection index
+		if self.forms is not None:
+			infls = self._lookup_form( key )
+		else:
+			infls = self._match_inflects( key )
 
 		# Run against stems
-		stems = self._check_stems( s, infls )
+		stems = self._check_stems( key, infls )
 
 		# Lookup dict info
 		if reduced:
@@ -128,6 +615,18 @@ class Parse:
 		else:
 			out = self._lookup_stems( stems, out )
 
+		if not fallbacks:
+			return out
+
+		# If nothing was found, try splitting a tickon from the start of the word (e.g. si-quis)
+		if len( out ) == 0 and not reduced:
+			split = self.enclitics.split_tickon( s )
+			if split is not None:
+				rest, tickon = split
+				rest_out = self._latin_to_english( rest )
+				if rest_out:
+					return [ tickon ] + rest_out
+
 		# If not already reduced, reduce the word and recurse
 		if len( out ) == 0 and not reduced:
 			r_out = self._reduce( s )
@@ -139,56 +638,101 @@ class Parse:
 
 		return out
 
-
-	def _check_stems(self, s, infls):
+	def _match_inflects(self, s):
 		"""
-		For each inflection that was a match, remove the inflection from
-		the end of the word string and then check the resulting stem
-		against the list of stems loaded in __init__
+		Walk back from the end of the word and collect the inflection index
+		entries for every ending that the word ends with, shortest first
+
+		Returns a list of ( ending, { (pos, n[0]) : [ infl, ... ] } )
+
+		In a parse_many batch the index lookup of each ending is done once,
+		since the words of a text share most of their endings (a lookup in a
+		lexicon file decodes and groups the inflection records)
 		"""
-		match_stems = []
+		memo = self._batch_memo( 'endings' )
+		matches = []
 
-		# For each of the inflections that is a match, strip the inflection from the end of the word
-		# and look up the stripped word (w) in the stems
-		for infl in infls:
-			w = re.sub ( infl['ending'] + "$", "", s )
+		for length in self.ending_lengths:
+			if length > len( s ):
+				break
 
-			for stem in self.stems:
-				if w == stem['orth']:
+			ending = s[len( s ) - length:]
+			if memo is None:
+				groups = self.inflect_index.get( ending )
+			elif ending in memo:
+				groups = memo[ending]
+			else:
+				groups = memo[ending] = self.inflect_index.get( ending )
 
-					# If the inflection and stem identify as the same part of speech
-					if (
-							infl['pos'] == stem['pos']
-						or (
-								infl['pos'] == "VPAR"
-							and stem['pos'] == "V"
-							)
-						):
+			if groups:
+				matches.append( ( ending, groups ) )
 
-						# Ensure the inflections apply to the correct stem decl/conj/etc
-						if infl['n'][0] == stem['n'][0]:
-							is_in_match_stems = False
+		return matches
 
-							# If this stem is already in the match_stems list, add infl to that stem (if not already an infl in that stem list)
-							for i, mst in enumerate(match_stems):
-								if stem == mst['st']:
-									is_in_match_stems = True
+	def _lookup_form(self, s):
+		"""
+		Get the inflections that spell the word with some stem from the
+		full-form table, in the same shape as _match_inflects
 
-									# So the matches a stem in the match_stems.  Is it unique to that stem's infls. If so, append it to that stem's infls.
-									is_in_stem_infls = False
-									for stem_infl in mst['infls']:
-										if stem_infl['form'] == infl['form']:
-											is_in_stem_infls = True
-											# we found a match, stop looking
-											break
+		Only the endings in the table come back, so _check_stems probes
+		the stem index once per ending that is known to match
+		"""
+		matches = []
 
-									if not is_in_stem_infls:
-										mst['infls'].append( infl )
+		# Inflection numbers are sorted, so endings come shortest first
+		for i in self.forms.get( s, () ):
+			infl = self.inflects[i]
+			if not matches or matches[-1][0] != infl['ending']:
+				matches.append( ( infl['ending'], {} ) )
 
+			matches[-1][1].setdefault( ( infl['pos'], infl['n'][0] ), [] ).append( infl )
 
+		return matches
 
-							if not is_in_match_stems:
-								match_stems.append({ 'st':stem, 'infls':[infl] })
+	def _check_stems(self, s, infls):
+		"""
+		For each ending that was a match, remove the ending from the end
+		of the word string and then check the resulting stem against the
+		stem index built in __init__
+		"""
+		match_stems = []
+
+		# stem -> ( its entry in match_stems, forms of the infls already in the entry )
+		seen = {}
+
+		# For each of the endings that is a match, strip the ending from the end of the word
+		# and look up the stripped word (w) in the stems
+		for ending, groups in infls:
+			w = s[:len( s ) - len( ending )]
+			if self._fold_stems is not None:
+				w = self._fold_stems( w )
+
+			w_stems = self.stem_index.get( w )
+			if not w_stems:
+				continue
+
+			buckets = self._group_stems( w_stems )
+
+			for ( pos, n ), group in groups.items():
+				# Stems with the same part of speech and decl/conj as the inflections
+				# (participle inflections also apply to verb stems)
+				stems = buckets.get( ( pos, n ), [] )
+				if pos == "VPAR":
+					stems = stems + buckets.get( ( "V", n ), [] )
+
+				for stem in stems:
+					for infl in group:
+						# If this stem is already in the match_stems list, add infl to that stem (if not already an infl in that stem list)
+						if stem in seen:
+							mst, forms = seen[stem]
+							if infl['form'] not in forms:
+								forms.add( infl['form'] )
+								mst['infls'].append( infl )
+
+						else:
+							mst = { 'st':stem, 'infls':[infl] }
+							seen[stem] = ( mst, { infl['form'] } )
+							match_stems.append( mst )
 
 
 		return match_stems
@@ -197,102 +741,105 @@ class Parse:
 	def _lookup_stems(self, match_stems, out, get_word_ends=True):
 		"""Find the word id mentioned in the stem in the dictionary"""
 
-		for stem in match_stems:
-			for word in self.dict:
-				# Lookup by id
-				if stem['st']['wid'] == word['id']:
-
-					# If word already in out, add stem to word stems
-					is_in_out = False
-					for i, w in enumerate(out):
-						if (
-								'id' in w['w'] and word['id'] == w['w']['id']
-							or
-								w['w']['orth'] == word['orth']
-							):
+		# Position in out of the first word with a given id / orth, and the stems of each word
+		by_id = {}
+		by_orth = {}
+		out_stems = []
+		for i, w in enumerate( out ):
+			self._index_out_word( w, i, by_id, by_orth, out_stems )
 
-							# It is in the out list already, flag and then check if the stem is already in the stems
-							is_in_out = True
+		for stem in match_stems:
+			# Lookup by id
+			word = self.dict_index.get( stem['st']['wid'] )
+			if word is not None:
 
-							# Ensure the stem is not already in the out word stems
-							is_in_out_word_stems = False
-							for st in out[i]['stems']:
-								if st == stem:
-									is_in_out_word_stems = True
-									# We have a match, break the loop
-									break
+				# If word already in out (same id or same orth), add stem to word stems
+				i = min( by_id.get( word['id'], len( out ) ), by_orth.get( word['orth'], len( out ) ) )
+				if i < len( out ):
 
-							if not is_in_out_word_stems:
-								out[i]['stems'].append(stem)
-							# If we matched a word in the out, break the loop
-							break
+					# Ensure the stem is not already in the out word stems
+					key = self._stem_match_key( stem )
+					if key not in out_stems[i]:
+						out_stems[i].add( key )
+						out[i]['stems'].append(stem)
 
-					# If the word isn't in the out yet
-					if not is_in_out:
+				# If the word isn't in the out yet
+				else:
 
-						# Check the VPAR / V relationship
-						if word['pos'] == "V":
+					# Check the VPAR / V relationship
+					if word['pos'] == "V":
 
-							# If the stem doesn't match the 4th principle part, it's not VPAR
-							if word['parts'].index( stem['st']['orth'] ) == 3:
+						# If the stem doesn't match the 4th principle part, it's not VPAR
+						if word['parts'].index( stem['st']['orth'] ) == 3:
 
-								# Remove "V" infls
-								stem = self._remove_extra_infls(stem, "V")
+							# Remove "V" infls
+							stem = self._remove_extra_infls(stem, "V")
 
-							else:
-								# Remove "VPAR" infls
-								stem = self._remove_extra_infls(stem, "VPAR")
+						else:
+							# Remove "VPAR" infls
+							stem = self._remove_extra_infls(stem, "VPAR")
 
 
 
-						# Lookup word ends
-						# Need to Clone this object - otherwise self.dict is modified
-						word_clone = deepcopy( word )
-						if get_word_ends:
-							word_clone = self._get_word_endings( word_clone )
+					# Lookup word ends
+					# The entry is shared and read-only; the principal parts go in a small Lemma
+					if get_word_ends:
+						word = Lemma( word, self._get_word_endings( word ) )
 
-						# Finally, append new word to out
-						out.append( { 'w': word_clone, 'stems': [ stem ] } )
+					# Finally, append new word to out
+					out.append( { 'w': word, 'stems': [ stem ] } )
+					self._index_out_word( out[-1], len( out ) - 1, by_id, by_orth, out_stems )
 
 		return out
 
+	def _index_out_word(self, w, i, by_id, by_orth, out_stems):
+		"""Record the id, orth and stems of the word at position i of out (see _lookup_stems)"""
+		if 'id' in w['w']:
+			by_id.setdefault( w['w']['id'], i )
+		by_orth.setdefault( w['w']['orth'], i )
+		out_stems.append( set( self._stem_match_key( st ) for st in w.get( 'stems', [] ) ) )
 
-	def _split_enclitic(self, s):
-		"""Split enclitic ending from word"""
-		out = []
+		return
 
-		# Test the different tackons / packons as specified in addons.py
-		for e in self.addons['tackons']:
-			if s.endswith( e['orth'] ):
+	def _stem_match_key(self, stem):
+		"""Hashable key of a stem match: equal keys for equal { 'st', 'infls' } entries"""
+		return ( stem['st'], tuple( stem['infls'] ) )
 
-				# Standardize data format
-				e['form'] = e['orth']
 
-				# Est exception
-				if s != "est":
-					out.append( { 'w' : e, "stems" : [] } )
-					s = re.sub( e['orth'] + "$", "", s)
-				break
+	def _split_enclitic(self, s):
+		"""Split enclitic ending from word"""
+		return self.enclitics.split( s )
 
-		if s.startswith( "qu" ):
-			for e in self.addons['packons']:
-				if s.endswith( e['orth'] ):
-					out.append( { 'w' : e } )
-					s = re.sub( e['orth'] + "$", "", s)
-					break
+	def _get_word_endings(self, word):
+		"""
+		Get the word endings for the stems in the Dictionary and return
+		the principal parts as a new tuple (the entry is not changed)
 
-		else:
-			for e in self.addons['not_packons']:
-				if s.endswith( e['orth'] ):
-					out.append( { 'w' : e } )
-					s = re.sub( e['orth'] + "$", "", s)
-					break
+		The endings only depend on the part of speech, the n values and
+		which parts are filled in, so they are worked out once for each
+		combination and then appended to the parts of every such entry
+		"""
+		parts = word['parts']
+		filled = tuple( len( part ) > 0 and part != "-" for part in parts )
+
+		key = ( word['pos'], tuple( word['n'] ), filled )
+		endings = self._part_endings.get( key )
+		if endings is None:
+			# Find the endings by giving placeholder parts to the full search
+			template = {
+					'pos' : word['pos'],
+					'n' : key[1],
+					'parts' : [ "\0" if f else "" for f in filled ]
+				}
+			endings = tuple( part[1:] for part in self._find_word_endings( template ) )
+			self._part_endings[key] = endings
 
-		return s, out
+		return tuple( part + ending for part, ending in zip( parts, endings ) )
 
-	def _get_word_endings(self, word):
+	def _find_word_endings(self, word):
 		"""
-		Get the word endings for the stems in the Dictionary;
+		Search the inflections for the endings of the principal parts of
+		word (see _get_word_endings);
 		eventually this should be phased out in favor of including the
 		endings in the words in the dict_line dict
 		"""
@@ -301,7 +848,8 @@ class Parse:
 		end_three = False
 		end_four = False
 
-		len_w_p = len( word['parts'] )
+		parts = list( word['parts'] )
+		len_w_p = len( parts )
 
 		for infl in self.inflects:
 			# If the conjugation/declesion is a match AND the part of speech is a match (regularize V/VPAR)
@@ -319,27 +867,27 @@ class Parse:
 				# If the word is a verb, get the 4 principle parts
 				if word['pos'] in ["V", "VPAR"]:
 					# Pres act ind first singular
-					if len_w_p > 0 and not end_one and ( len( word['parts'][0] ) > 0 and word['parts'][0] != "-" ):
+					if len_w_p > 0 and not end_one and ( len( parts[0] ) > 0 and parts[0] != "-" ):
 						if infl['form'] == "PRES  ACTIVE  IND  1 S":
-							word['parts'][0] = word['parts'][0] + infl['ending']
+							parts[0] = parts[0] + infl['ending']
 							end_one = True
 
 					# Pres act inf
-					if len_w_p > 1 and not end_two and ( len( word['parts'][1] ) > 0 and word['parts'][1] != "-" ):
+					if len_w_p > 1 and not end_two and ( len( parts[1] ) > 0 and parts[1] != "-" ):
 						if infl['form'] == "PRES  ACTIVE  INF  0 X":
-							word['parts'][1] = word['parts'][1] + infl['ending']
+							parts[1] = parts[1] + infl['ending']
 							end_two = True
 
 					# Perf act ind first singular
-					if len_w_p > 2 and not end_three and ( len( word['parts'][2] ) > 0 and word['parts'][2] != "-" ):
+					if len_w_p > 2 and not end_three and ( len( parts[2] ) > 0 and parts[2] != "-" ):
 						if infl['form'] == "PERF  ACTIVE  IND  1 S":
-							word['parts'][2] = word['parts'][2] + infl['ending']
+							parts[2] = parts[2] + infl['ending']
 							end_three = True
 
 					# Perfect passive participle
-					if len_w_p > 3 and not end_four and ( len( word['parts'][3] ) > 0 and word['parts'][3] != "-" ):
+					if len_w_p > 3 and not end_four and ( len( parts[3] ) > 0 and parts[3] != "-" ):
 						if infl['form'] == "NOM S M PRES PASSIVE PPL":
-							word['parts'][3] = word['parts'][3] + infl['ending']
+							parts[3] = parts[3] + infl['ending']
 							end_four = True
 
 
@@ -347,14 +895,14 @@ class Parse:
 				elif word['pos'] in ["N", "ADJ", "PRON"]:
 					# Nominative singular
 					if len_w_p > 0 and not end_one:
-						if infl['form'].startswith("NOM S") and ( len( word['parts'][0] ) > 0 and word['parts'][0] != "-" ):
-							word['parts'][0] = word['parts'][0] + infl['ending']
+						if infl['form'].startswith("NOM S") and ( len( parts[0] ) > 0 and parts[0] != "-" ):
+							parts[0] = parts[0] + infl['ending']
 							end_one = True
 
 					# Genitive singular
 					if len_w_p > 1 and not end_two:
-						if infl['form'].startswith("GEN S") and ( len( word['parts'][1] ) > 0 and word['parts'][1] != "-" ):
-							word['parts'][1] = word['parts'][1] + infl['ending']
+						if infl['form'].startswith("GEN S") and ( len( parts[1] ) > 0 and parts[1] != "-" ):
+							parts[1] = parts[1] + infl['ending']
 							end_two = True
 
 
@@ -363,60 +911,63 @@ class Parse:
 		if word['pos'] in ["V", "VPAR"]:
 			if len_w_p > 0 and not end_one:
 				for inf in self.inflects:
-					if infl['form'] == "PRES  ACTIVE  IND  1 S" and infl['n'] == [0,0] and ( len( word['parts'][0] ) > 0 and word['parts'][0] != "-" ):
-						word['parts'][0] = word['parts'][0] + infl['ending']
+					if infl['form'] == "PRES  ACTIVE  IND  1 S" and infl['n'] == ( 0, 0 ) and ( len( parts[0] ) > 0 and parts[0] != "-" ):
+						parts[0] = parts[0] + infl['ending']
 						break
 
 			if len_w_p > 1 and not end_two:
 				for inf in self.inflects:
-					if infl['form'] == "PRES  ACTIVE  INF  0 X" and infl['n'] == [0,0] and ( len( word['parts'][1] ) > 0 and word['parts'][1] != "-" ):
-						word['parts'][1] = word['parts'][1] + infl['ending']
+					if infl['form'] == "PRES  ACTIVE  INF  0 X" and infl['n'] == ( 0, 0 ) and ( len( parts[1] ) > 0 and parts[1] != "-" ):
+						parts[1] = parts[1] + infl['ending']
 						break
 
 			if len_w_p > 2 and not end_three:
 				for inf in self.inflects:
-					if infl['form'] == "PERF  ACTIVE  IND  1 S" and infl['n'] == [0,0] and ( len( word['parts'][2] ) > 0 and word['parts'][2] != "-" ):
-						word['parts'][2] = word['parts'][2] + infl['ending']
+					if infl['form'] == "PERF  ACTIVE  IND  1 S" and infl['n'] == ( 0, 0 ) and ( len( parts[2] ) > 0 and parts[2] != "-" ):
+						parts[2] = parts[2] + infl['ending']
 						break
 
 			if len_w_p > 3 and not end_four:
 				for inf in self.inflects:
-					if infl['form'] == "NOM S M PERF PASSIVE PPL" and infl['n'] == [0,0] and ( len( word['parts'][3] ) > 0 and word['parts'][3] != "-" ):
-						word['parts'][3] = word['parts'][3] + infl['ending']
+					if infl['form'] == "NOM S M PERF PASSIVE PPL" and infl['n'] == ( 0, 0 ) and ( len( parts[3] ) > 0 and parts[3] != "-" ):
+						parts[3] = parts[3] + infl['ending']
 						break
 
 		# Finish for nouns
 		elif word['pos'] in ["N", "ADJ", "PRON"]:
 			# Nominative singular
-			if len_w_p > 0 and not end_one and infl['n'] == [0,0] and ( len( word['parts'][0] ) > 0 and word['parts'][0] != "-" ):
+			if len_w_p > 0 and not end_one and infl['n'] == ( 0, 0 ) and ( len( parts[0] ) > 0 and parts[0] != "-" ):
 				for inf in self.inflects:
 					if infl['form'].startswith("NOM S"):
-						word['parts'][0] = word['parts'][0] + infl['ending']
+						parts[0] = parts[0] + infl['ending']
 						end_one = True
 
 			# Genitive singular
-			if len_w_p > 1 and not end_two and infl['n'] == [0,0] and ( len( word['parts'][1] ) > 0 and word['parts'][1] != "-" ):
+			if len_w_p > 1 and not end_two and infl['n'] == ( 0, 0 ) and ( len( parts[1] ) > 0 and parts[1] != "-" ):
 				for inf in self.inflects:
 					if infl['form'].startswith("GEN S"):
-						word['parts'][1] = word['parts'][1] + infl['ending']
+						parts[1] = parts[1] + infl['ending']
 						end_two = True
 
 		# If endings really don't exist, fall back to default
 		if word['pos'] in ["V", "VPAR"]:
-			if len_w_p > 0 and not end_one and ( len( word['parts'][0] ) > 0 and word['parts'][0] != "-" ):
-				word['parts'][0] = word['parts'][0] + "o"
-			if len_w_p > 1 and not end_two and ( len( word['parts'][1] ) > 0 and word['parts'][1] != "-" ):
-				word['parts'][1] = word['parts'][1] + "?re"
-			if len_w_p > 2 and not end_three and ( len( word['parts'][2] ) > 0 and word['parts'][2] != "-" ):
-				word['parts'][2] = word['parts'][2] + "i"
-			if len_w_p > 3 and not end_four and ( len( word['parts'][3] ) > 0 and word['parts'][3] != "-" ):
-				word['parts'][3] = word['parts'][3] + "us"
+			if len_w_p > 0 and not end_one and ( len( parts[0] ) > 0 and parts[0] != "-" ):
+				parts[0] = parts[0] + "o"
+			if len_w_p > 1 and not end_two and ( len( parts[1] ) > 0 and parts[1] != "-" ):
+				parts[1] = parts[1] + "?re"
+			if len_w_p > 2 and not end_three and ( len( parts[2] ) > 0 and parts[2] != "-" ):
+				parts[2] = parts[2] + "i"
+			if len_w_p > 3 and not end_four and ( len( parts[3] ) > 0 and parts[3] != "-" ):
+				parts[3] = parts[3] + "us"
 
-		return word
+		return tuple( parts )
 
 	def sanitize(self, input_string):
 		"""
 		Sanitize the input string from all punct and numbers, make lowercase
+
+		(Kept for compatibility; the parse_* methods split texts with
+		self.tokenizer instead)
 		"""
 
 		s = input_string
@@ -427,36 +978,82 @@ class Parse:
 		return s
 
 	def _reduce(self, s):
-		"""Reduce the stem with suffixes and try again"""
+		"""
+		Reduce the stem with prefixes and suffixes and try again
+
+		Every split of the word into a prefix, a base and a suffix (either
+		affix may be left out) is tried, longest base first: the matches of
+		all the bases of the longest length that matches anything are
+		merged. The matches of each base are kept in a bounded cache, since
+		many compounds share a base, and are shared between results.
+		"""
+		bases = list( dict.fromkeys( self._reductions( s ) ) )
+		bases.sort( key=len, reverse=True )
+
 		out = []
-		is_unique = False
-		found_new_match = False
-		infls = []
-		# For each inflection match, check prefixes and suffixes
-		for prefix in self.addons['prefixes']:
-			if s.startswith( prefix['orth'] ):
-				s = re.sub ( "^" + prefix['orth'], "", s )
-				out.append({ 'w' : prefix, 'stems' : [], 'addon' : "prefix" })
-				break
-		for suffix in self.addons['suffixes']:
-			if s.endswith( suffix['orth'] ):
-				s = re.sub ( suffix['orth'] + "$", "", s )
-				out.append({ 'w' : suffix, 'stems' : [], 'addon' : "suffix" })
+		for i, base in enumerate( bases ):
+			# Stop at the first (longest) length that has matches
+			if out and len( base ) < len( bases[i - 1] ):
 				break
 
-		# Find forms with the 'reduced' flag set to true
-		out = self._find_forms( s, True )
+			# Find forms with the 'reduced' flag set to true
+			found = self._reduced.get( base )
+			if found is None:
+				found = self._find_forms( base, True )
+				self._reduced.put( base, found )
 
-		# Has reducing input string given us useful data?
-		# If not, return false
-		for word in out:
-			if len(word['stems']) > 0:
-				found_new_match = True
+			out = self._merge_reduced( out, found )
 
-		if not found_new_match:
-			out = False
+		# Has reducing input string given us useful data?
+		return out or False
 
-		return out
+	def _merge_reduced(self, out, found):
+		"""
+		Add the words of found (the matches of a base) to out, one entry
+		per word with no stem twice; stems without inflections are left out
+		"""
+		merged = list( out )
+		by_word = {}
+		for i, w in enumerate( merged ):
+			by_word[ self._reduced_word_key( w['w'] ) ] = i
+
+		for w in found:
+			stems = [ stem for stem in w['stems'] if stem['infls'] ]
+			if not stems:
+				continue
+
+			key = self._reduced_word_key( w['w'] )
+			i = by_word.get( key )
+			if i is None:
+				by_word[key] = len( merged )
+				merged.append( { 'w' : w['w'], 'stems' : stems } )
+			else:
+				known = set( self._stem_match_key( stem ) for stem in merged[i]['stems'] )
+				new_stems = [ stem for stem in stems if self._stem_match_key( stem ) not in known ]
+				if new_stems:
+					merged[i] = { 'w' : merged[i]['w'], 'stems' : merged[i]['stems'] + new_stems }
+
+		return merged
+
+	def _reduced_word_key(self, word):
+		return word['id'] if 'id' in word else word['orth']
+
+	def _reductions(self, s):
+		"""Yield the bases left by each prefix/suffix split of s, in the order they are tried"""
+		for prefix in self.prefix_trie.matches( s ) + [ None ]:
+			rest = s
+			if prefix is not None:
+				rest = s[len( prefix['orth'] ):]
+
+			for suffix in self.suffix_trie.matches( rest ) + [ None ]:
+				# The word itself has already been looked up
+				if prefix is None and suffix is None:
+					continue
+
+				if suffix is None:
+					yield rest
+				else:
+					yield rest[:len( rest ) - len( suffix['orth'] )]
 
 	def _remove_extra_infls(self, stem, remove_type="VPAR"):
 		"""Remove Vs or VPARs from a list of inflections"""
@@ -475,29 +1072,27 @@ class Parse:
 		for word in out:
 			obj = {
 					'orth': [],
-					'senses': word['w']['senses'],
+					'senses': list( word['w']['senses'] ),
 					'infls': []
 				}
 
 			# Format the orth of the new object
 			if 'parts' in word['w']:
-				obj['orth'] = word['w']['parts']
+				obj['orth'] = list( word['w']['parts'] )
 			else:
 				obj['orth'] = [word['w']['orth']]
 
 			# Format the stems / inflections of the new object
+			obj_infl_keys = set()
 			if 'stems' in word:
 				for stem in word['stems']:
 					to_add_infls = []
+					to_add_forms = set()
 					for infl in stem['infls']:
 
 						# Ensure the infl isn't already in the infls
-						is_in_formatted_infls = False
-						for formatted_infl in to_add_infls:
-							if infl['form'] == formatted_infl['form']:
-								is_in_formatted_infls = True
-
-						if not is_in_formatted_infls:
+						if infl['form'] not in to_add_forms:
+							to_add_forms.add( infl['form'] )
 							to_add_infls.append({
 									'ending' : infl['ending'],
 									'pos' : infl['pos'],
@@ -505,16 +1100,16 @@ class Parse:
 								})
 
 					for formatted_infl in to_add_infls:
-						if formatted_infl not in obj['infls']:
+						key = ( formatted_infl['ending'], formatted_infl['pos'], formatted_infl['form'] )
+						if key not in obj_infl_keys:
+							obj_infl_keys.add( key )
 							obj['infls'].append(formatted_infl)
 
-			else:
-				word['w']['form'] = word['w']['pos']
-
 			# If we still don't have any inflections associated with the object
+			# (addons without stems are listed with their part of speech as form)
 			if len(obj['infls']) == 0:
 				obj['infls'] = [ {
-						'form': word['w']['form'],
+						'form': word['w']['form'] if 'stems' in word else word['w']['pos'],
 						'ending': '',
 						'pos': word['w']['pos']
 					} ]
@@ -533,30 +1128,21 @@ class Parse:
 		"""
 
 		for infl in word['infls']:
-			# Translate form
-			infl['form'] = self._format_form( infl['form'], infl['pos'] )
-
-			# Set part of speech
-			if infl['pos'] == "N":
-				infl['pos'] = "noun"
-			elif infl['pos'] == "V":
-				infl['pos'] = "verb"
-			elif infl['pos'] == "VPAR":
-				infl['pos'] = "participle"
-			elif infl['pos'] == "ADJ":
-				infl['pos'] = "adjective"
-			elif infl['pos'] == "PREP":
-				infl['pos'] = "adjective"
-			elif infl['pos'] == "PRON":
-				infl['pos'] = "pronoun"
-			elif infl['pos'] == "INTERJ":
-				infl['pos'] = "interjection"
-			elif infl['pos'] == "NUM":
-				infl['pos'] = "number"
-			elif infl['pos'] == "CONJ":
-				infl['pos'] = "conjunction"
-			elif infl['pos'] == "PREP":
-				infl['pos'] = "preposition"
+			key = ( infl['form'], infl['pos'] )
+
+			# Decode each distinct form once; the output gets its own copy
+			morphology = self._morphology.get( key )
+			if morphology is None:
+				# Translate form and set part of speech
+				formatted = self._format_form( infl['form'], infl['pos'] )
+				morphology = (
+						tuple( ( k, tuple( v ) if isinstance( v, list ) else v ) for k, v in formatted.items() ),
+						POS_NAMES.get( infl['pos'], infl['pos'] )
+					)
+				self._morphology[key] = morphology
+
+			features, infl['pos'] = morphology
+			infl['form'] = { k : list( v ) if isinstance( v, tuple ) else v for k, v in features }
 
 		return word
 
@@ -645,88 +1231,30 @@ class Parse:
 		return formatted
 
 	def _trans_declension(self, abb):
-		w = ''
-		declensions = {
-			'NOM' : "nominative",
-			'VOC' : "vocative",
-			'GEN' : "genitive",
-			'DAT' : "dative",
-			'ACC' : "accusative",
-			'LOC' : "locative",
-			'ABL' : "ablative",
-			'X' : ""
-		}
-
-		w = declensions[ abb ]
-
-		return w
+		return DECLENSIONS[ abb ]
 
 	def _trans_number(self, abb):
-		w = ''
-		numbers = {
-			'S' : "singular",
-			'P' : "plural",
-			'X' : ""
-		}
-
-		w = numbers[ abb ]
-
-		return w
+		return NUMBERS[ abb ]
 
 	def _trans_gender(self, abb):
-		w = ''
-		genders = {
-			'M' : "masculine",
-			'F' : "feminine",
-			'N' : "neuter",
-			'C' : "C",
-			'X' : ""
-		}
-
-		w = genders[ abb ]
-
-		return w
+		return GENDERS[ abb ]
 
 	def _trans_mood(self, abb):
-		w = ''
-		moods = {
-			'IND' : "indicative",
-			'SUB' : "subjunctive",
-			'IMP' : "imperative",
-			'INF' : "infinitive",
-			'X' : ""
-		}
+		return MOODS[ abb ]
 
-		w = moods[ abb ]
+	def _trans_voice(self, abb):
+		return VOICES[ abb ]
 
-		return w
+	def _trans_tense(self, abb):
+		return TENSES[ abb ]
 
-	def _trans_voice(self, abb):
-		w = ''
-		voices = {
-			'ACTIVE' : "active",
-			'PASSIVE' : "passive",
-			'X' : ""
-		}
 
-		w = voices[ abb ]
+def _unload_module(name):
+	"""Remove a module from sys.modules and from its package"""
+	module = sys.modules.pop( name, None )
 
-		return w
+	package, _, attribute = name.rpartition( "." )
+	if module is not None and getattr( sys.modules.get( package ), attribute, None ) is module:
+		delattr( sys.modules[package], attribute )
 
-	def _trans_tense(self, abb):
-		w = ''
-
-		tenses = {
-			'PRES' : "present",
-			'IMPF' : "imperfect",
-			'PERF' : "perfect",
-			'FUT' : "future",
-			'FUTP' : "future perfect",
-			'PLUP' : "pluperfect",
-			'INF' : "infinitive",
-			'X' : ""
-		}
-
-		w = tenses[ abb ]
-
-		return w
+	return
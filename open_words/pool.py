@@ -0,0 +1,164 @@
+"""
+pool.py
+
+Parse a corpus of text files on a pool of worker processes
+
+Every worker opens the same precompiled lexicon file (see
+build_lexicon.py); it is memory-mapped read-only, so the operating
+system shares its pages between the workers instead of each worker
+importing its own copy of the literal data modules. Without a lexicon
+file, one is built from the data modules into a temporary file first.
+
+Lines are sent to the workers in chunks and the results come back in
+input order. Only a bounded number of chunks is in flight at a time, so
+memory use does not grow with the size of the corpus.
+
+Usage:
+
+	from open_words.pool import parse_corpus
+
+	for path, line_number, words in parse_corpus(paths, workers=8):
+		...
+
+"""
+
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+
+from open_words.lexicon import DEFAULT_PATH, Lexicon
+
+# Parser of the current worker process
+_parser = None
+
+# Error raised while setting up the parser of the current worker process
+_init_error = None
+
+
+def _init_worker(lexicon, forms):
+	global _parser, _init_error
+	from open_words.parse import Parse
+
+	# An initializer that raises makes the pool start a new worker, over
+	# and over; keep the error and raise it from the first task instead
+	try:
+		_parser = Parse( lexicon=lexicon, forms=forms )
+	except Exception as e:
+		_init_error = e
+
+	return
+
+
+def _parse_chunk(chunk):
+	"""Parse one chunk of lines as a single batch and split the results back into lines"""
+	if _parser is None:
+		raise _init_error
+
+	path, first_line, lines = chunk
+
+	line_words = [ _parser.tokenizer.words( line ) for line in lines ]
+	results = _parser.parse_many( [ word for words in line_words for word in words ] )
+
+	out = []
+	i = 0
+	for words in line_words:
+		out.append( results[i:i + len( words )] )
+		i += len( words )
+
+	return path, first_line, out
+
+
+def _read_chunks(paths, chunk_lines, encoding):
+	"""Yield ( path, number of the first line, lines ) for each file"""
+	for path in paths:
+		with open( path, encoding=encoding ) as f:
+			lines = []
+			first_line = 1
+			for i, line in enumerate( f ):
+				lines.append( line.rstrip( "\n" ) )
+				if len( lines ) == chunk_lines:
+					yield path, first_line, lines
+					lines = []
+					first_line = i + 2
+
+			if lines:
+				yield path, first_line, lines
+
+
+def parse_corpus(paths, workers=None, lexicon=None, forms=None, chunk_lines=200, max_pending=None, encoding="utf-8"):
+	"""
+	Parse text files line by line on a process pool
+
+	Yield ( path, line number, results ) for every line of every file, in
+	input order, where results is the list parse_line would return for
+	the line. lexicon is the path of a file written by build_lexicon.py
+	(by default open_words/data/lexicon.bin if it exists, otherwise a
+	temporary one is built), and forms an optional full-form table path.
+	At most max_pending chunks (default: twice the number of workers) are
+	in flight at a time.
+	"""
+	if lexicon is None and os.path.exists( DEFAULT_PATH ):
+		lexicon = DEFAULT_PATH
+
+	temporary = None
+	if lexicon is None:
+		lexicon = temporary = _build_temporary_lexicon()
+
+	try:
+		# Open the lexicon once here, so that a missing or invalid file raises
+		# before any worker is started
+		Lexicon( lexicon )
+
+		if workers is None:
+			workers = multiprocessing.cpu_count()
+		if max_pending is None:
+			max_pending = 2 * workers
+
+		with multiprocessing.Pool( workers, initializer=_init_worker, initargs=( lexicon, forms ) ) as pool:
+			pending = deque()
+
+			for chunk in _read_chunks( paths, chunk_lines, encoding ):
+				pending.append( pool.apply_async( _parse_chunk, ( chunk, ) ) )
+
+				if len( pending ) >= max_pending:
+					for item in _lines( pending.popleft().get() ):
+						yield item
+
+			while pending:
+				for item in _lines( pending.popleft().get() ):
+					yield item
+	finally:
+		if temporary is not None:
+			os.remove( temporary )
+
+	return
+
+
+def _build_temporary_lexicon():
+	"""
+	Build a lexicon file from the data modules and return its path; the
+	build runs in a process of its own, whose memory is freed afterwards
+	"""
+	from open_words.build_lexicon import build_lexicon
+
+	fd, path = tempfile.mkstemp( prefix="open_words-", suffix=".bin" )
+	os.close( fd )
+
+	try:
+		with multiprocessing.Pool( 1 ) as builder:
+			builder.apply( build_lexicon, ( path, ) )
+	except ImportError as e:
+		os.remove( path )
+		raise ImportError( "No lexicon file and the data modules cannot be loaded (%s); build %s with python -m open_words.build_lexicon" % ( e, DEFAULT_PATH ) ) from e
+	except BaseException:
+		os.remove( path )
+		raise
+
+	return path
+
+
+def _lines(parsed_chunk):
+	path, first_line, results = parsed_chunk
+	for i, words in enumerate( results ):
+		yield path, first_line + i, words
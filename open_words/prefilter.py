@@ -0,0 +1,159 @@
+"""
+prefilter.py
+
+Reject tokens that cannot match anything before they are parsed
+
+Unknown tokens (names, Greek words, OCR errors, typos) are the most
+expensive ones: they go through every ending, then every prefix/suffix
+reduction, before coming back empty. An UnknownFilter answers most of
+them up front with a Bloom filter over the stem spellings of the
+lexicon (checked against every split of the token into a stem and a
+known ending) and a bounded cache of tokens that recently failed.
+
+The filter can only let through tokens that turn out not to match (at
+roughly the chosen false-positive rate); it never rejects a token that
+would match.
+
+"""
+
+import math
+import threading
+from collections import OrderedDict, namedtuple
+
+FilterInfo = namedtuple( 'FilterInfo', [ 'checks', 'negative_hits', 'rejected', 'passed', 'failed', 'fp_rate', 'nbytes' ] )
+
+
+class BloomFilter:
+	"""Bloom filter of strings sized for capacity items at a false-positive rate of fp_rate"""
+
+	def __init__(self, capacity, fp_rate=0.01):
+		if not 0 < fp_rate < 1:
+			raise ValueError( "fp_rate must be between 0 and 1" )
+
+		capacity = max( capacity, 1 )
+		self.fp_rate = fp_rate
+		self.size = max( 8, int( math.ceil( -capacity * math.log( fp_rate ) / math.log( 2 ) ** 2 ) ) )
+		self.hash_count = max( 1, int( round( self.size / capacity * math.log( 2 ) ) ) )
+		self.bits = bytearray( ( self.size + 7 ) // 8 )
+
+	def _positions(self, key):
+		# Python's string hash is cached on the string; it is only stable
+		# within one process, which is all an in-memory filter needs
+		h = hash( key ) & 0xFFFFFFFFFFFFFFFF
+		h1 = h & 0xFFFFFFFF
+		h2 = ( h >> 32 ) | 1
+		size = self.size
+
+		return [ ( h1 + i * h2 ) % size for i in range( self.hash_count ) ]
+
+	def add(self, key):
+		for position in self._positions( key ):
+			self.bits[position >> 3] |= 1 << ( position & 7 )
+
+	def __contains__(self, key):
+		bits = self.bits
+		for position in self._positions( key ):
+			if not bits[position >> 3] & ( 1 << ( position & 7 ) ):
+				return False
+
+		return True
+
+	@property
+	def nbytes(self):
+		return len( self.bits )
+
+
+class UnknownFilter:
+	"""
+	Bloom filter over stem spellings, the set of inflection endings and
+	an LRU cache of up to negative_size tokens that recently gave no
+	result; see filter_info() for the counters. normalize_stem, if given,
+	is applied to the stem part of a token before it is checked
+	"""
+
+	def __init__(self, stem_keys, endings, fp_rate=0.01, negative_size=10000, normalize_stem=None):
+		stem_keys = list( stem_keys )
+		self.stems = BloomFilter( len( stem_keys ), fp_rate )
+		for key in stem_keys:
+			self.stems.add( key )
+
+		self.endings = frozenset( endings )
+		self.ending_lengths = tuple( sorted( set( len( ending ) for ending in self.endings ) ) )
+		self.negative_size = negative_size
+		self.normalize_stem = normalize_stem
+
+		self._negative = OrderedDict()
+		self._lock = threading.Lock()
+		self._checks = 0
+		self._negative_hits = 0
+		self._rejected = 0
+		self._passed = 0
+		self._failed = 0
+
+	def could_be_form(self, s):
+		"""Whether s might be some stem followed by one of its endings"""
+		endings = self.endings
+		stems = self.stems
+		normalize_stem = self.normalize_stem
+
+		for length in self.ending_lengths:
+			if length > len( s ):
+				break
+
+			i = len( s ) - length
+			if s[i:] in endings:
+				stem = s[:i] if normalize_stem is None else normalize_stem( s[:i] )
+				if stem in stems:
+					return True
+
+		return False
+
+	def rejects(self, s, could_match):
+		"""
+		Return True if s is known not to match: it failed recently, or
+		could_match( s ) (the parser's conservative check) says so
+		"""
+		with self._lock:
+			self._checks += 1
+			if s in self._negative:
+				self._negative.move_to_end( s )
+				self._negative_hits += 1
+				return True
+
+		if could_match( s ):
+			with self._lock:
+				self._passed += 1
+			return False
+
+		with self._lock:
+			self._rejected += 1
+
+		return True
+
+	def add_failure(self, s):
+		"""Remember a token that passed the filter but gave no result"""
+		with self._lock:
+			self._failed += 1
+			if self.negative_size:
+				self._negative[s] = True
+				self._negative.move_to_end( s )
+				while len( self._negative ) > self.negative_size:
+					self._negative.popitem( last=False )
+
+		return
+
+	def clear(self):
+		"""Forget the failed tokens and reset the counters"""
+		with self._lock:
+			self._negative.clear()
+			self._checks = 0
+			self._negative_hits = 0
+			self._rejected = 0
+			self._passed = 0
+			self._failed = 0
+
+		return
+
+	def filter_info(self):
+		with self._lock:
+			return FilterInfo( self._checks, self._negative_hits, self._rejected, self._passed, self._failed, self.stems.fp_rate, self.stems.nbytes )
@@ -0,0 +1,243 @@
+"""
+records.py
+
+Compact, read-only record types for the loaded lexicon
+
+Each stem, inflection, dictionary entry and unique is held in a slotted
+object instead of a dict, with list fields stored as tuples and the
+small repeated values (part of speech, form, n) shared between records.
+Records still support the dict-style reads the parser uses
+(record['orth'], record.get('form'), 'parts' in record), so they can
+stand in for the rows of the data modules.
+
+"""
+
+import sys
+
+
+class Record:
+	"""Base class of the lexicon records; subclasses list their fields in __slots__"""
+
+	__slots__ = ()
+
+	# Fields whose values repeat across many records and are shared
+	_shared = ()
+
+	def __init__(self, **fields):
+		for name, value in fields.items():
+			object.__setattr__( self, name, value )
+
+	@classmethod
+	def from_dict(cls, data, shared=None):
+		"""
+		Build a record from a row of the data modules, converting lists to
+		tuples and sharing repeated values through the shared dict
+		"""
+		if shared is None:
+			shared = {}
+
+		fields = {}
+		for name in cls.__slots__:
+			if name not in data:
+				continue
+
+			value = data[name]
+			if isinstance( value, list ):
+				value = tuple( value )
+			if name in cls._shared:
+				if isinstance( value, str ):
+					value = sys.intern( value )
+				value = shared.setdefault( value, value )
+
+			fields[name] = value
+
+		return cls( **fields )
+
+	def __getitem__(self, name):
+		try:
+			return getattr( self, name )
+		except AttributeError:
+			raise KeyError( name )
+
+	def get(self, name, default=None):
+		return getattr( self, name, default )
+
+	def __contains__(self, name):
+		return name in self.__slots__ and hasattr( self, name )
+
+	def keys(self):
+		return [ name for name in self.__slots__ if hasattr( self, name ) ]
+
+	def items(self):
+		return [ ( name, getattr( self, name ) ) for name in self.keys() ]
+
+	def __iter__(self):
+		return iter( self.keys() )
+
+	def __len__(self):
+		return len( self.keys() )
+
+	def to_dict(self):
+		"""Return the record as a new dict, with tuples as lists, like the data modules"""
+		return {
+				name : list( value ) if isinstance( value, tuple ) else value
+				for name, value in self.items()
+			}
+
+	def __setattr__(self, name, value):
+		raise AttributeError( "%s records are read-only" % type( self ).__name__ )
+
+	def __delattr__(self, name):
+		raise AttributeError( "%s records are read-only" % type( self ).__name__ )
+
+	def __eq__(self, other):
+		if type( other ) is not type( self ):
+			return NotImplemented
+
+		return self.items() == other.items()
+
+	def __ne__(self, other):
+		equal = self.__eq__( other )
+		if equal is NotImplemented:
+			return equal
+
+		return not equal
+
+	def __hash__(self):
+		return hash( ( type( self ), tuple( self.items() ) ) )
+
+	def __repr__(self):
+		return "%s(%s)" % ( type( self ).__name__, ", ".join( "%s=%r" % item for item in self.items() ) )
+
+	# Records never change, so copies can share them
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+	def __reduce__(self):
+		return ( _rebuild, ( type( self ), dict( self.items() ) ) )
+
+
+def _rebuild(cls, fields):
+	return cls( **fields )
+
+
+class Word(Record):
+	"""Dictionary entry (DICTLINE)"""
+	__slots__ = ( 'id', 'orth', 'parts', 'pos', 'form', 'n', 'senses' )
+	_shared = ( 'pos', 'form', 'n' )
+
+
+class Stem(Record):
+	"""Stem (STEMLIST)"""
+	__slots__ = ( 'orth', 'pos', 'form', 'n', 'wid' )
+	_shared = ( 'pos', 'form', 'n' )
+
+
+class Inflect(Record):
+	"""Inflection (INFLECTS)"""
+	__slots__ = ( 'ending', 'pos', 'note', 'n', 'form' )
+	_shared = ( 'ending', 'pos', 'note', 'n', 'form' )
+
+
+class Unique(Record):
+	"""Unique form (UNIQUES)"""
+	__slots__ = ( 'orth', 'pos', 'form', 'senses' )
+	_shared = ( 'pos', 'form' )
+
+
+class Addon(Record):
+	"""Prefix, suffix or enclitic (ADDONS)"""
+	__slots__ = ( 'orth', 'pos', 'form', 'senses' )
+	_shared = ( 'pos', 'form' )
+
+
+class Lemma:
+	"""
+	A dictionary entry together with its principal parts (the parts with
+	their endings), as found in results; every other field is read from
+	the shared entry, which is not copied
+	"""
+
+	__slots__ = ( 'word', 'parts' )
+
+	def __init__(self, word, parts):
+		object.__setattr__( self, 'word', word )
+		object.__setattr__( self, 'parts', parts )
+
+	def __getitem__(self, name):
+		if name == 'parts':
+			return self.parts
+
+		return self.word[name]
+
+	def get(self, name, default=None):
+		if name == 'parts':
+			return self.parts
+
+		return self.word.get( name, default )
+
+	def __contains__(self, name):
+		return name in self.word
+
+	def keys(self):
+		return self.word.keys()
+
+	def items(self):
+		return [ ( name, self[name] ) for name in self.keys() ]
+
+	def __iter__(self):
+		return iter( self.keys() )
+
+	def __len__(self):
+		return len( self.word )
+
+	def to_dict(self):
+		"""Return the entry with its principal parts as a new dict, like the data modules"""
+		data = self.word.to_dict()
+		data['parts'] = list( self.parts )
+		return data
+
+	def __setattr__(self, name, value):
+		raise AttributeError( "Lemma objects are read-only" )
+
+	def __eq__(self, other):
+		if type( other ) is not Lemma:
+			return NotImplemented
+
+		return self.word == other.word and self.parts == other.parts
+
+	def __ne__(self, other):
+		equal = self.__eq__( other )
+		if equal is NotImplemented:
+			return equal
+
+		return not equal
+
+	def __hash__(self):
+		return hash( ( self.word, self.parts ) )
+
+	def __repr__(self):
+		return "Lemma(%r, %r)" % ( self.word, self.parts )
+
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+	def __reduce__(self):
+		return ( Lemma, ( self.word, self.parts ) )
+
+
+def compact(rows, record_class, shared=None):
+	"""Convert a list of data module rows to records; records are kept as they are"""
+	if shared is None:
+		shared = {}
+
+	return [
+			row if isinstance( row, record_class ) else record_class.from_dict( row, shared )
+			for row in rows
+		]
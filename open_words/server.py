@@ -0,0 +1,250 @@
+"""
+server.py
+
+Local HTTP/JSON lookup server
+
+Keeps one parser (and its lexicon) loaded and answers lookups over
+HTTP/1.1 with persistent connections:
+
+	GET  /parse?word=portae     one word, JSON result
+	POST /parse                 JSON list of words (or {"words": [...]});
+	                            returns a JSON list of results, or streams
+	                            one result per line (NDJSON) for large
+	                            batches or when the client sends
+	                            "Accept: application/x-ndjson"
+	GET  /health                200 as long as the server is up
+	GET  /ready                 200 once the lexicon is loaded, 503 before
+
+A lookup that raises is answered with status 500 and {"error": ...}.
+
+Usage:
+
+	python -m open_words.server [--host HOST] [--port PORT] [--lexicon PATH] [--forms PATH] [--cache-size N] [--filter-fp-rate P] [--orthography strict|folded]
+
+"""
+
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from open_words.lexicon import DEFAULT_PATH
+from open_words.orthography import STRICT, FOLDED
+
+NDJSON = "application/x-ndjson"
+
+# Batches larger than this are streamed as NDJSON
+STREAM_THRESHOLD = 1000
+
+# Number of words parsed at a time while streaming
+STREAM_CHUNK = 256
+
+
+class LookupServer(ThreadingHTTPServer):
+	"""Threaded HTTP server holding the shared parser"""
+
+	daemon_threads = True
+
+	def __init__(self, address, parser_factory):
+		super().__init__( address, LookupHandler )
+		self.parser = None
+		self.ready = threading.Event()
+		self.load_error = None
+
+		# Load the lexicon in the background so /health answers right away
+		self._loader = threading.Thread( target=self._load, args=( parser_factory, ), daemon=True )
+		self._loader.start()
+
+	def _load(self, parser_factory):
+		try:
+			self.parser = parser_factory()
+			self.ready.set()
+		except Exception as e:
+			self.load_error = e
+			raise
+
+		return
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+	"""Request handler for the lookup server"""
+
+	# Persistent connections
+	protocol_version = "HTTP/1.1"
+
+	def do_GET(self):
+		url = urlsplit( self.path )
+
+		if url.path == "/health":
+			self._send_json( 200, { 'status' : "ok" } )
+
+		elif url.path == "/ready":
+			if self.server.ready.is_set():
+				self._send_json( 200, { 'status' : "ready" } )
+			elif self.server.load_error is not None:
+				self._send_json( 503, { 'status' : "failed", 'error' : str( self.server.load_error ) } )
+			else:
+				self._send_json( 503, { 'status' : "loading" } )
+
+		elif url.path == "/parse":
+			words = parse_qs( url.query ).get( "word" )
+			if not words:
+				self._send_json( 400, { 'error' : "missing word parameter" } )
+			elif self._check_ready():
+				# Words are lowercased and stripped of diacritics, as when parsing a text
+				parser = self.server.parser
+				self._send_result( parser.parse, parser.tokenizer.normalize( words[0] ) )
+
+		else:
+			self._send_json( 404, { 'error' : "not found" } )
+
+		return
+
+	def do_POST(self):
+		url = urlsplit( self.path )
+
+		if url.path != "/parse":
+			self._discard_body()
+			self._send_json( 404, { 'error' : "not found" } )
+			return
+
+		try:
+			length = int( self.headers.get( "Content-Length", 0 ) )
+			words = json.loads( self.rfile.read( length ).decode( "utf-8" ) )
+			if isinstance( words, dict ):
+				words = words.get( "words" )
+			if not isinstance( words, list ) or not all( isinstance( w, str ) for w in words ):
+				raise ValueError( "expected a list of words" )
+		except ValueError as e:
+			self._send_json( 400, { 'error' : str( e ) } )
+			return
+
+		if not self._check_ready():
+			return
+
+		if len( words ) > STREAM_THRESHOLD or NDJSON in self.headers.get( "Accept", "" ):
+			self._stream_ndjson( words )
+		else:
+			self._send_result( self.server.parser.parse_many, words )
+
+		return
+
+	def _check_ready(self):
+		if self.server.ready.is_set():
+			return True
+
+		self._send_json( 503, { 'error' : "lexicon is not loaded yet" } )
+		return False
+
+	def _send_result(self, lookup, words):
+		"""Send lookup( words ) as JSON, or a 500 error if the lookup raises"""
+		try:
+			result = lookup( words )
+		except Exception as e:
+			self.log_error( "lookup failed: %r", e )
+			self._send_json( 500, { 'error' : str( e ) } )
+			return
+
+		self._send_json( 200, result )
+
+		return
+
+	def _send_json(self, status, data):
+		body = json.dumps( data ).encode( "utf-8" )
+
+		self.send_response( status )
+		self.send_header( "Content-Type", "application/json" )
+		self.send_header( "Content-Length", str( len( body ) ) )
+		self.end_headers()
+		self.wfile.write( body )
+
+		return
+
+	def _stream_ndjson(self, words):
+		"""
+		Send one result per line with chunked transfer encoding, parsing as
+		it goes; a lookup error is a 500 response if it comes before the
+		first line, else a last line {"error": ...}
+		"""
+		chunks = [ words[i:i + STREAM_CHUNK] for i in range( 0, len( words ), STREAM_CHUNK ) ] or [ [] ]
+
+		try:
+			results = self.server.parser.parse_many( chunks[0] )
+		except Exception as e:
+			self.log_error( "lookup failed: %r", e )
+			self._send_json( 500, { 'error' : str( e ) } )
+			return
+
+		self.send_response( 200 )
+		self.send_header( "Content-Type", NDJSON )
+		self.send_header( "Transfer-Encoding", "chunked" )
+		self.end_headers()
+		self._write_lines( results )
+
+		for chunk in chunks[1:]:
+			try:
+				results = self.server.parser.parse_many( chunk )
+			except Exception as e:
+				self.log_error( "lookup failed: %r", e )
+				self._write_lines( [ { 'error' : str( e ) } ] )
+				break
+
+			self._write_lines( results )
+
+		self.wfile.write( b"0\r\n\r\n" )
+
+		return
+
+	def _write_lines(self, results):
+		"""Write results as one chunk of NDJSON lines"""
+		data = "".join( json.dumps( result ) + "\n" for result in results ).encode( "utf-8" )
+		if data:
+			self.wfile.write( b"%x\r\n%s\r\n" % ( len( data ), data ) )
+
+		return
+
+	def _discard_body(self):
+		length = int( self.headers.get( "Content-Length", 0 ) or 0 )
+		if length:
+			self.rfile.read( length )
+
+		return
+
+
+def main(argv=None):
+	argp = argparse.ArgumentParser( description="Open Words lookup server" )
+	argp.add_argument( "--host", default="127.0.0.1" )
+	argp.add_argument( "--port", type=int, default=8000 )
+	argp.add_argument( "--lexicon", default=None, help="binary lexicon file (default: open_words/data/lexicon.bin if it exists)" )
+	argp.add_argument( "--forms", default=None, help="full-form table file" )
+	argp.add_argument( "--cache-size", type=int, default=None, help="number of results to cache" )
+	argp.add_argument( "--filter-fp-rate", type=float, default=None, help="reject unknown words with a Bloom filter of this false-positive rate" )
+	argp.add_argument( "--orthography", choices=[ "strict", "folded" ], default="strict", help="folded matches u/v, i/j and macron variants" )
+	args = argp.parse_args( argv )
+
+	lexicon = args.lexicon
+	orthography = FOLDED if args.orthography == "folded" else STRICT
+	if lexicon is None and os.path.exists( DEFAULT_PATH ):
+		lexicon = DEFAULT_PATH
+
+	def parser_factory():
+		from open_words.parse import Parse
+		return Parse( lexicon=lexicon, forms=args.forms, cache_size=args.cache_size, filter_fp_rate=args.filter_fp_rate, orthography=orthography )
+
+	server = LookupServer( ( args.host, args.port ), parser_factory )
+	print( "Serving on http://%s:%d" % server.server_address[:2] )
+
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+
+	return
+
+
+if __name__ == "__main__":
+	main()
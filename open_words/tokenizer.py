@@ -0,0 +1,56 @@
+"""
+tokenizer.py
+
+Split text into words for parsing
+
+One regular expression pass over the text finds the words (runs of
+letters, with any combining marks); everything else, i.e. spaces, ASCII and
+Unicode punctuation, dashes and digits, separates them. Each word is
+lowercased and stripped of diacritics (macrons, breves, diaereses),
+and comes with its start and end offsets in the original text. Other
+spelling variants (u/v, i/j) are left to the parser's orthography (see
+orthography.py), which folds the index keys the same way as the words.
+
+Usage:
+
+	for word, start, end in tokenize( "Arma virumque canō, Trōiae quī prīmus ab ōrīs" ):
+		...
+
+"""
+
+import re
+import unicodedata
+
+# A word: letters (not digits or "_") and combining marks
+WORD = re.compile( r"(?:[^\W\d_]|[\u0300-\u036f])+" )
+
+
+class Tokenizer:
+	"""Word splitter; subclass it and override normalize() to change the words"""
+
+	def tokenize(self, text):
+		"""Yield ( word, start, end ) for each word of text"""
+		for match in WORD.finditer( text ):
+			yield self.normalize( match.group() ), match.start(), match.end()
+
+	def words(self, text):
+		"""Return the words of text"""
+		return [ self.normalize( match.group() ) for match in WORD.finditer( text ) ]
+
+	def normalize(self, word):
+		"""Lowercase word and strip its diacritics"""
+		word = word.lower()
+
+		if not word.isascii():
+			word = "".join( c for c in unicodedata.normalize( "NFD", word ) if not unicodedata.combining( c ) )
+
+		return word
+
+
+# Shared by the calls to tokenize()
+_default = Tokenizer()
+
+
+def tokenize(text):
+	"""Yield ( word, start, end ) for each word of text (see Tokenizer)"""
+	return _default.tokenize( text )
@@ -12,7 +12,14 @@ setup(
         'Natural Language :: English',
         'Operating System :: OS Independent',
         'Operating System :: POSIX',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Text Processing',
         'Topic :: Text Processing :: General',
         'Topic :: Text Processing :: Linguistic',
@@ -24,7 +31,8 @@ setup(
     license='MIT',
     long_description="""Open Words is a port of William Whitaker's 'Whitaker's Words' original Ada code to Python so that it may continue to be useful to Latin students and philologists for years to come.""",
     name='open_words',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'tests']),
+    python_requires='>=3.7',
     url='https://github.com/ArchimedesDigital/open_words',
     version='0.0.1',
     zip_safe=True,
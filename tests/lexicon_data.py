@@ -0,0 +1,72 @@
+"""
+lexicon_data.py
+
+Small lexicon for the tests
+
+The dictionary modules (dict_line, stem_list) are generated and not
+part of the repository, so the tests read the stems of a few words
+straight from STEMLIST.GEN, the same way format_data.py does, and give
+each word a placeholder dictionary entry.
+
+"""
+
+import os
+
+STEMLIST = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), "open_words", "data", "STEMLIST.GEN" )
+
+
+def read_stems(path=STEMLIST):
+	"""Read every stem of STEMLIST.GEN as format_data.import_stems does"""
+	stems = []
+	n = []
+
+	with open( path ) as f:
+		for line in f:
+			if len( line[26:30].strip() ) > 0:
+				n = line[26:30].strip().split(" ")
+				for i, v in enumerate( n ):
+					try:
+						n[i] = int( v )
+					except ValueError:
+						pass
+
+			stems.append( {
+					'orth' : line[0:19].strip(),
+					'pos' : line[19:26].strip(),
+					'form' : line[26:45].strip(),
+					'n' : list( n ),
+					'wid' : int( line[50:].strip() ),
+				} )
+
+	return stems
+
+
+def load_lexicon(orths=None):
+	"""
+	Return ( words_dict, stems ) for every word that has a stem spelled
+	as one of orths, or for every word
+	"""
+	all_stems = read_stems()
+	if orths is None:
+		stems = all_stems
+	else:
+		wids = set( stem['wid'] for stem in all_stems if stem['orth'] in orths )
+		stems = [ stem for stem in all_stems if stem['wid'] in wids ]
+
+	words = {}
+	for stem in stems:
+		word = words.get( stem['wid'] )
+		if word is None:
+			word = words[stem['wid']] = {
+					'id' : stem['wid'],
+					'orth' : stem['orth'],
+					'parts' : [],
+					'pos' : stem['pos'],
+					'form' : stem['form'],
+					'n' : list( stem['n'] ),
+					'senses' : [ "sense %d" % stem['wid'] ],
+				}
+		if stem['orth'] not in word['parts']:
+			word['parts'].append( stem['orth'] )
+
+	return [ words[wid] for wid in sorted( words ) ], stems
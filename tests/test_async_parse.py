@@ -0,0 +1,61 @@
+"""
+test_async_parse.py
+
+Coalescing of concurrent lookups in AsyncParse
+
+"""
+
+import asyncio
+import unittest
+
+from open_words.async_parse import AsyncParse
+from open_words.parse import Parse
+
+from tests.lexicon_data import load_lexicon
+
+
+class FailingParse(Parse):
+	"""Parse that raises for one word"""
+
+	def parse(self, input_string, direction="latin_to_english", formatted=True):
+		if input_string == "fail":
+			raise RuntimeError( "cannot parse fail" )
+
+		return super().parse( input_string, direction, formatted )
+
+
+class AsyncParseTest(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		words_dict, stems = load_lexicon( ( "port", ) )
+		cls.parser = FailingParse( words_dict=words_dict, stems=stems )
+
+	def test_failing_word_only_fails_its_callers(self):
+		async def main():
+			parser = AsyncParse( self.parser )
+			return await asyncio.gather(
+					parser.parse( "portae" ),
+					parser.parse( "fail" ),
+					parser.parse( "portam" ),
+					return_exceptions=True
+				)
+
+		portae, fail, portam = asyncio.run( main() )
+		self.assertEqual( portae, self.parser.parse( "portae" ) )
+		self.assertIsInstance( fail, RuntimeError )
+		self.assertEqual( portam, self.parser.parse( "portam" ) )
+
+	def test_shared_lookups_get_their_own_result(self):
+		async def main():
+			parser = AsyncParse( self.parser )
+			return await asyncio.gather( parser.parse( "portae", formatted=False ), parser.parse( "portae", formatted=False ) )
+
+		first, second = asyncio.run( main() )
+		self.assertIsNot( first, second )
+		first['defs'].clear()
+		self.assertTrue( second['defs'] )
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,95 @@
+"""
+test_automaton.py
+
+The minimal automaton against a plain dict
+
+"""
+
+import random
+import unittest
+
+from open_words.automaton import Automaton
+
+
+def random_items(rng, count, alphabet="abcd", max_length=8, max_value=20):
+	"""
+	Random keys over a small alphabet (so that many share prefixes and
+	suffixes) with small values (so that shared suffixes often end in the
+	same value), plus a few large values
+	"""
+	items = {}
+	while len( items ) < count:
+		key = "".join( rng.choice( alphabet ) for _ in range( rng.randint( 0, max_length ) ) )
+		items[key] = rng.randint( 0, max_value ) if rng.random() < 0.9 else rng.randint( 0, 0x10FFFF )
+
+	return items
+
+
+class AutomatonTest(unittest.TestCase):
+
+	def check(self, expected, automaton, rng):
+		self.assertEqual( len( automaton ), len( expected ) )
+		self.assertEqual( list( automaton.items() ), sorted( expected.items() ) )
+
+		for key, value in expected.items():
+			self.assertIn( key, automaton )
+			self.assertEqual( automaton.get( key ), value, key )
+
+		# Absent keys: random ones, and proper prefixes and extensions of present ones
+		absent = set( random_items( rng, 200, "abcde" ) )
+		for key in expected:
+			absent.update( ( key[:-1], key + "a", key + "e" ) )
+		for key in absent - set( expected ):
+			self.assertNotIn( key, automaton )
+			self.assertIsNone( automaton.get( key ), key )
+			self.assertEqual( automaton.get( key, -1 ), -1 )
+
+		# Prefix enumeration
+		for prefix in ( "", "a", "ab", "dcb", "abcd", "e" ) + tuple( rng.sample( sorted( expected ), 10 ) ):
+			self.assertEqual(
+					list( automaton.items( prefix ) ),
+					sorted( ( key, value ) for key, value in expected.items() if key.startswith( prefix ) ),
+					prefix
+				)
+
+	def test_random_keys(self):
+		for seed in range( 20 ):
+			rng = random.Random( seed )
+			expected = random_items( rng, rng.randint( 1, 500 ) )
+
+			# Inserted out of order
+			items = list( expected.items() )
+			rng.shuffle( items )
+
+			self.check( expected, Automaton.build( items ), rng )
+
+	def test_shared_suffixes_are_merged(self):
+		rng = random.Random( 0 )
+		stems = [ "am", "port", "laud", "voc", "nav" ]
+		endings = [ "o", "as", "at", "amus", "atis", "ant", "abam", "abant" ]
+
+		expected = {}
+		for stem in stems:
+			for ending in endings:
+				expected[stem + ending] = 1
+		items = list( expected.items() )
+		rng.shuffle( items )
+
+		automaton = Automaton.build( items )
+		self.check( expected, automaton, rng )
+
+		# The endings are stored once, not once per stem
+		states = len( automaton.first ) - 1
+		trie_states = len( set( key[:i] for key in expected for i in range( len( key ) + 1 ) ) )
+		self.assertLess( states, trie_states - ( len( stems ) - 1 ) * len( endings ) )
+
+	def test_empty(self):
+		automaton = Automaton.build( [] )
+		self.assertEqual( len( automaton ), 0 )
+		self.assertEqual( list( automaton.items() ), [] )
+		self.assertNotIn( "", automaton )
+		self.assertIsNone( automaton.get( "a" ) )
+
+
+if __name__ == "__main__":
+	unittest.main()
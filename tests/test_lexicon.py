@@ -0,0 +1,117 @@
+"""
+test_lexicon.py
+
+Binary lexicon files: build / load round trip, format checks and the
+hash indexes
+
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from open_words.build_lexicon import build_lexicon
+from open_words.lexicon import Lexicon, LexiconError, HEADER, MAGIC, hash_key
+from open_words.parse import Parse
+
+from tests.lexicon_data import load_lexicon
+
+ORTHS = ( "port", "amic", "arm", "ten", "tenu", "allegorice", "alleg", "aeroid" )
+
+WORDS = (
+		"portae", "portam", "portabat", "amicus", "amicorum", "arma", "armis",
+		"tenet", "tenuis", "allegorice", "aeroide",
+		# uniques, enclitics and reductions
+		"est", "quisque", "armaque", "amicusne", "inportat", "deportabat",
+		# nothing
+		"xqzt", "portaxyz",
+	)
+
+
+def raw(result):
+	"""An unformatted result as plain data"""
+	return json.loads( json.dumps( result, sort_keys=True, default=lambda o: o.to_dict() ) )
+
+
+class LexiconTest(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree( self.dir )
+
+	def build(self, name="lexicon.bin", **data):
+		return build_lexicon( os.path.join( self.dir, name ), **data )
+
+	def write(self, name, data):
+		path = os.path.join( self.dir, name )
+		with open( path, "wb" ) as f:
+			f.write( data )
+
+		return path
+
+	def test_round_trip(self):
+		words_dict, stems = load_lexicon( ORTHS )
+		in_memory = Parse( words_dict=words_dict, stems=stems )
+		from_file = Parse( lexicon=self.build( words_dict=words_dict, stems=stems ) )
+
+		for word in WORDS:
+			self.assertEqual( from_file.parse( word ), in_memory.parse( word ), word )
+			self.assertEqual( raw( from_file.parse( word, formatted=False ) ), raw( in_memory.parse( word, formatted=False ) ), word )
+
+	def test_records(self):
+		words_dict, stems = load_lexicon( ORTHS )
+		lexicon = Lexicon( self.build( words_dict=words_dict, stems=stems ) )
+
+		self.assertEqual( [ word.to_dict() for word in lexicon.words ], words_dict )
+		self.assertEqual( [ stem.to_dict() for stem in lexicon.stems ], stems )
+		for word in words_dict:
+			self.assertEqual( lexicon.dict_index.get( word['id'] ).to_dict(), word )
+		self.assertIsNone( lexicon.dict_index.get( max( word['id'] for word in words_dict ) + 1 ) )
+
+	def test_bad_files(self):
+		with open( self.build( words_dict=[], stems=[] ), "rb" ) as f:
+			data = f.read()
+
+		bad = {
+				"empty" : b"",
+				"short" : data[:HEADER.size - 1],
+				"magic" : b"NOTALEXI" + data[8:],
+				"version" : HEADER.pack( MAGIC, 99, 0 ) + data[HEADER.size:],
+				"directory" : data[:HEADER.size + 4],
+				"sections" : data[:len( data ) // 2],
+			}
+		for name, contents in bad.items():
+			with self.assertRaises( LexiconError, msg=name ) as raised:
+				Lexicon( self.write( name, contents ) )
+
+			if name == "version":
+				self.assertIn( "version 99", str( raised.exception ) )
+
+	def test_hash_collisions(self):
+		# Keys that all hash to the last slot of a 16-slot table, so that
+		# probing also wraps around to the start
+		keys = [ key for key in ( "k%d" % i for i in range( 5000 ) ) if hash_key( key.encode( "utf-8" ) ) & 15 == 15 ]
+		present, absent = keys[:8], keys[8:12]
+
+		# Two records for the first key, in order
+		uniques = [ { 'orth' : key, 'pos' : "X", 'form' : "", 'senses' : [ key ] } for key in present ]
+		uniques.append( { 'orth' : present[0], 'pos' : "X", 'form' : "", 'senses' : [ "second" ] } )
+
+		lexicon = Lexicon( self.build( words_dict=[], stems=[], uniques=uniques ) )
+		index = lexicon.unique_index
+
+		self.assertEqual( sorted( index.keys() ), sorted( present ) )
+		self.assertEqual( [ list( u['senses'] ) for u in index.get( present[0] ) ], [ [ present[0] ], [ "second" ] ] )
+		for key in present[1:]:
+			self.assertEqual( [ list( u['senses'] ) for u in index.get( key ) ], [ [ key ] ] )
+		for key in absent:
+			self.assertIsNone( index.get( key ) )
+			self.assertNotIn( key, index )
+
+
+if __name__ == "__main__":
+	unittest.main()
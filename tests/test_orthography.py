@@ -0,0 +1,126 @@
+"""
+test_orthography.py
+
+Spelling normalization of the indexes and of the words looked up
+
+"""
+
+import unittest
+
+from open_words.parse import Parse
+from open_words.orthography import STRICT, FOLDED, Orthography
+
+from benchmarks.corpus import generate_corpus
+from tests.lexicon_data import load_lexicon
+
+ORTHS = ( "angust", "corniger", "aeroid", "claus", "clausur", "port", "praed", "cael", "cel" )
+
+
+def parser(orthography=STRICT, orths=ORTHS, **kwargs):
+	words_dict, stems = load_lexicon( orths )
+	return Parse( words_dict=words_dict, stems=stems, orthography=orthography, **kwargs )
+
+
+class FoldAeTest(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		cls.strict = parser()
+		cls.folded = parser( Orthography( fold_ae=True ) )
+
+	def test_endings_are_not_folded(self):
+		# -ae and -e endings stay apart: no nom/abl "e" readings for angustae,
+		# no gen/dat "ae" readings for clausure, no adverb anguste
+		for word in ( "angustae", "cornigerae", "aeroide", "clausure", "portae" ):
+			self.assertEqual( self.folded.parse( word ), self.strict.parse( word ), word )
+
+	def test_stems_are_folded(self):
+		self.assertEqual( self.folded.parse( "preda" )['defs'], self.strict.parse( "praeda" )['defs'] )
+		self.assertEqual( self.folded.parse( "predae" )['defs'], self.strict.parse( "praedae" )['defs'] )
+
+	def test_prefilter_agrees(self):
+		filtered = parser( Orthography( fold_ae=True ), filter_fp_rate=0.01 )
+		for word in ( "preda", "predae", "angustae", "clausure", "xqzt" ):
+			self.assertEqual( filtered.parse( word ), self.folded.parse( word ), word )
+
+
+
+class VariantEncliticTest(unittest.TestCase):
+
+	ORTHS = ( "arm", "ten", "tenu", "su", "ardu", "statu" )
+
+	@classmethod
+	def setUpClass(cls):
+		cls.strict = parser( orths=cls.ORTHS )
+		cls.folded = parser( FOLDED, orths=cls.ORTHS )
+
+	def test_ue_is_split_as_ve(self):
+		self.assertTrue( self.folded.parse( "armave" )['defs'] )
+		self.assertEqual( self.folded.parse( "armaue" )['defs'], self.folded.parse( "armave" )['defs'] )
+		self.assertEqual( self.folded.parse( "quisue" )['defs'], self.folded.parse( "quisve" )['defs'] )
+		self.assertEqual( self.strict.parse( "armaue" )['defs'], [] )
+
+	def test_words_ending_like_variant_enclitics(self):
+		# -ue and -uis are only split off if the word finds nothing as it is
+		for word in ( "tenue", "suis", "arduis", "statue", "aliquis" ):
+			self.assertEqual( self.folded.parse( word ), self.strict.parse( word ), word )
+
+	def test_prefilter_agrees(self):
+		filtered = parser( FOLDED, orths=self.ORTHS, filter_fp_rate=0.01 )
+		for word in ( "armaue", "armave", "quisue", "tenue", "suis", "xqzt" ):
+			self.assertEqual( filtered.parse( word ), self.folded.parse( word ), word )
+
+
+def analyses(defs):
+	"""Return ( principal parts, senses, inflection ) for each analysis in a formatted result"""
+	return [
+			( entry['orth'], entry.get( 'senses' ), infl )
+			for entry in defs
+			for infl in entry.get( 'infls' ) or [ None ]
+		]
+
+
+def is_folded_match(expected, found):
+	"""Whether found has all the analyses of expected, plus only analyses of words spelled with v or j"""
+	expected = analyses( expected )
+	found = analyses( found )
+
+	if any( analysis not in found for analysis in expected ):
+		return False
+
+	for analysis in found:
+		if analysis not in expected and not any( "v" in orth or "j" in orth for orth in analysis[0] ):
+			return False
+
+	return True
+
+
+class FoldedCorpusTest(unittest.TestCase):
+	"""
+	A word without v or j is spelled the same under every orthography, so
+	the folded parser must find everything the strict one finds for it; it
+	may only add entries spelled with v or j (iam also finds jam)
+	"""
+
+	# Words ending like a folded addon, and words with a "qu" before one
+	WORDS = ( "suis", "tenue", "arduis", "ambigue", "assidue", "statue", "aliquis", "quisque", "suusque" )
+
+	def test_words_without_v_or_j(self):
+		words_dict, stems = load_lexicon()
+		strict = Parse( words_dict=words_dict, stems=stems )
+		folded = Parse( words_dict=words_dict, stems=stems, orthography=FOLDED )
+
+		words = list( self.WORDS ) + [ token for path, token in generate_corpus( 500, 0 ) ]
+		words = [ word for word in dict.fromkeys( words ) if "v" not in word and "j" not in word ]
+
+		mismatches = []
+		for word in words:
+			expected = strict.parse( word )['defs']
+			if not is_folded_match( expected, folded.parse( word )['defs'] ):
+				mismatches.append( word )
+
+		self.assertEqual( mismatches, [] )
+
+
+if __name__ == "__main__":
+	unittest.main()
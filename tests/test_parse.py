@@ -0,0 +1,82 @@
+"""
+test_parse.py
+
+Enclitic splitting and prefix/suffix reduction
+
+"""
+
+import unittest
+
+from open_words.parse import Parse
+
+from tests.lexicon_data import load_lexicon
+
+ORTHS = ( "allegorice", "alleg", "subtim", "port" )
+
+
+def parser(orths=ORTHS, **kwargs):
+	words_dict, stems = load_lexicon( orths )
+	return Parse( words_dict=words_dict, stems=stems, **kwargs )
+
+
+def analyses(result):
+	"""Return ( stem, endings ) for each stem of an unformatted result"""
+	return [
+			( stem['st']['orth'], [ infl['ending'] for infl in stem['infls'] ] )
+			for word in result['defs']
+			for stem in word['stems']
+		]
+
+
+class ReduceTest(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		cls.parser = parser()
+
+	def test_word_found_as_it_is_is_not_reduced(self):
+		# Not allegori-ce, reduced to an imperative of alleg-
+		self.assertEqual( analyses( self.parser.parse( "allegorice", formatted=False ) ), [ ( "allegorice", [ "" ] ) ] )
+
+	def test_longest_base_wins(self):
+		# allegor-i (alleg-or) rather than alleg-ori
+		found = analyses( self.parser.parse( "allegori", formatted=False ) )
+		self.assertTrue( found )
+		for stem, endings in found:
+			self.assertEqual( ( stem, endings ), ( "alleg", [ "or" ] ) )
+
+	def test_words_are_not_repeated(self):
+		for word in ( "allegori", "inportat", "deportabat" ):
+			ids = [ w['w']['id'] for w in self.parser.parse( word, formatted=False )['defs'] ]
+			self.assertEqual( len( ids ), len( set( ids ) ), word )
+
+	def test_stems_without_inflections_are_left_out(self):
+		self.assertEqual( self.parser.parse( "benisubtimende" )['defs'], [] )
+
+	def test_reduced_bases_are_shared(self):
+		p = parser()
+		first = p.parse( "inportat", formatted=False )
+		self.assertEqual( p.parse( "deportat", formatted=False )['defs'], first['defs'] )
+		self.assertIn( "portat", p._reduced._data )
+
+
+class ClearCachesTest(unittest.TestCase):
+
+	def test_clear_caches(self):
+		p = parser( cache_size=100, filter_fp_rate=0.01 )
+		expected = [ p.parse( word ) for word in ( "portae", "inportat", "xqzt", "subtimarum" ) ]
+		self.assertTrue( len( p.cache ) and len( p._reduced ) and p.prefilter.filter_info().failed )
+
+		p.clear_caches()
+		self.assertEqual( ( len( p.cache ), len( p._reduced ), len( p.prefilter._negative ) ), ( 0, 0, 0 ) )
+		self.assertEqual( [ p.parse( word ) for word in ( "portae", "inportat", "xqzt", "subtimarum" ) ], expected )
+
+	def test_without_optional_caches(self):
+		p = parser()
+		p.parse( "inportat" )
+		p.clear_caches()
+		self.assertEqual( len( p._reduced ), 0 )
+
+
+if __name__ == "__main__":
+	unittest.main()
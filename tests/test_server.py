@@ -0,0 +1,81 @@
+"""
+test_server.py
+
+Lookups and errors of the HTTP server
+
+"""
+
+import http.client
+import json
+import threading
+import unittest
+
+from open_words.parse import Parse
+from open_words.server import LookupServer, NDJSON, STREAM_CHUNK
+
+from tests.lexicon_data import load_lexicon
+
+
+class FailingParse(Parse):
+	"""Parse that raises for one word"""
+
+	def parse(self, input_string, direction="latin_to_english", formatted=True):
+		if input_string == "fail":
+			raise RuntimeError( "cannot parse fail" )
+
+		return super().parse( input_string, direction, formatted )
+
+
+class ServerTest(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		words_dict, stems = load_lexicon( ( "port", ) )
+		cls.parser = FailingParse( words_dict=words_dict, stems=stems )
+		cls.server = LookupServer( ( "127.0.0.1", 0 ), lambda: cls.parser )
+		cls.server.ready.wait()
+		cls.thread = threading.Thread( target=cls.server.serve_forever, daemon=True )
+		cls.thread.start()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+
+	def request(self, method, path, body=None, headers={}):
+		connection = http.client.HTTPConnection( *self.server.server_address[:2] )
+		try:
+			connection.request( method, path, body, headers )
+			response = connection.getresponse()
+			return response.status, response.read().decode( "utf-8" )
+		finally:
+			connection.close()
+
+	def test_get_normalizes_the_word(self):
+		status, body = self.request( "GET", "/parse?word=Port%C4%81e" )
+		self.assertEqual( status, 200 )
+		self.assertEqual( json.loads( body ), self.parser.parse( "portae" ) )
+
+	def test_get_error(self):
+		status, body = self.request( "GET", "/parse?word=fail" )
+		self.assertEqual( ( status, json.loads( body ) ), ( 500, { 'error' : "cannot parse fail" } ) )
+
+	def test_post_error(self):
+		status, body = self.request( "POST", "/parse", json.dumps( [ "portae", "fail" ] ) )
+		self.assertEqual( ( status, json.loads( body ) ), ( 500, { 'error' : "cannot parse fail" } ) )
+
+	def test_stream_error(self):
+		status, body = self.request( "POST", "/parse", json.dumps( [ "fail" ] ), { "Accept" : NDJSON } )
+		self.assertEqual( ( status, json.loads( body ) ), ( 500, { 'error' : "cannot parse fail" } ) )
+
+		# After the first lines, the error ends the stream
+		words = [ "portae" ] * STREAM_CHUNK + [ "fail" ]
+		status, body = self.request( "POST", "/parse", json.dumps( words ), { "Accept" : NDJSON } )
+		lines = [ json.loads( line ) for line in body.splitlines() ]
+		self.assertEqual( status, 200 )
+		self.assertEqual( lines[:-1], [ self.parser.parse( "portae" ) ] * STREAM_CHUNK )
+		self.assertEqual( lines[-1], { 'error' : "cannot parse fail" } )
+
+
+if __name__ == "__main__":
+	unittest.main()